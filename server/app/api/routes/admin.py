@@ -3,7 +3,7 @@
 import logging
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Body, Query
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.asynchronous.database import AsyncDatabase
 from bson import ObjectId
 from bson.errors import InvalidId
 from datetime import datetime, timezone
@@ -17,10 +17,10 @@ from app.schemas.application_request import HRMappingRequestOut
 from app.schemas.search import RankedHR  # Import schema for search results
 from app.schemas.admin import AssignHrRequest # Import AssignHrRequest
 
-from app.db.mongodb import mongodb
+from app.db.mongodb import mongodb, USER_DOC_PROJECTION
 from app.core.config import settings
 from app.services.invitation_service import InvitationService, InvitationError
-from app.services.search_service import SearchService  # Import SearchService
+from app.services.search_service import SearchService, get_search_service  # Import SearchService
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -47,18 +47,18 @@ router = APIRouter(
 @router.get("/users", response_model=List[UserOut])
 async def get_all_users(
     admin_user: User = Depends(verify_admin_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ) -> List[UserOut]:
     logger.info(f"Admin {admin_user.username} requested list of all users.")
     users_collection = db[settings.MONGODB_COLLECTION_USERS]
-    users_list = await users_collection.find().to_list(length=None)
+    users_list = await users_collection.find(projection=USER_DOC_PROJECTION).to_list(length=None)
     return [UserOut.model_validate(u) for u in users_list]
 
 
 @router.get("/stats")
 async def get_system_stats(
     admin_user: User = Depends(verify_admin_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     logger.info(f"Admin {admin_user.username} requested system stats.")
     # ... (fetch counts) ...
@@ -90,7 +90,7 @@ async def get_system_stats(
 async def delete_user(
     user_id_to_delete: str,
     admin_user: User = Depends(verify_admin_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     """
     Deletes a specified user by ID. Prevents self-delete or deleting other Admins.
@@ -183,16 +183,18 @@ async def delete_user(
 @router.get("/hr-applications", response_model=List[HRMappingRequestOut])
 async def get_hr_applications(
     admin_user: User = Depends(verify_admin_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     # ... (Implementation uses InvitationService) ...
     logger.info(f"Admin {admin_user.username} fetching pending HR applications.")
     invitation_service = InvitationService(db=db)
     try:
-        pending_apps_data = await invitation_service.get_pending_applications_for_admin(
-            admin_user.id
-        )
-        return [HRMappingRequestOut.model_validate(app) for app in pending_apps_data]
+        return [
+            HRMappingRequestOut.model_validate(app)
+            async for app in invitation_service.get_pending_applications_for_admin(
+                admin_user.id
+            )
+        ]
     except Exception as e:
         logger.error(f"Error fetching HR applications: {e}", exc_info=True)
         raise HTTPException(status_code=500)
@@ -202,7 +204,7 @@ async def get_hr_applications(
 async def accept_hr_application(
     application_id: str,
     admin_user: User = Depends(verify_admin_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     # ... (Implementation uses InvitationService) ...
     logger.info(
@@ -228,7 +230,7 @@ async def accept_hr_application(
 async def reject_hr_application(
     application_id: str,
     admin_user: User = Depends(verify_admin_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     # ... (Implementation uses InvitationService) ...
     logger.info(
@@ -256,7 +258,7 @@ async def reject_hr_application(
 @router.get("/search-hr", response_model=List[RankedHR])
 async def search_hr_profiles(
     admin_user: User = Depends(verify_admin_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    search_service: SearchService = Depends(get_search_service),
     status_filter: Optional[HrStatus] = Query(None),
     keyword: Optional[str] = Query(None),
     yoe_min: Optional[int] = Query(None, ge=0),
@@ -266,7 +268,6 @@ async def search_hr_profiles(
     logger.info(
         f"Admin {admin_user.username} searching HR profiles. Status: {status_filter}, Keyword: {keyword}, YoE Min: {yoe_min}"
     )
-    search_service = SearchService(db=db)
     try:
         return await search_service.search_hr_profiles(
             keyword=keyword, yoe_min=yoe_min, status_filter=status_filter, limit=limit
@@ -280,7 +281,7 @@ async def search_hr_profiles(
 async def send_hr_mapping_request(
     hr_user_id: str,
     admin_user: User = Depends(verify_admin_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     # ... (Implementation uses InvitationService) ...
     logger.info(
@@ -319,7 +320,7 @@ async def assign_hr_to_candidate(
     candidate_id: str,
     assign_request: AssignHrRequest,
     admin_user: User = Depends(verify_admin_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     # ... (Implementation remains the same as previous version) ...
     candidate_oid = get_object_id(candidate_id)
@@ -349,7 +350,7 @@ async def assign_hr_to_candidate(
     )
     if update_result.modified_count == 1:
         updated_candidate_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one(
-            {"_id": candidate_oid}
+            {"_id": candidate_oid}, projection=USER_DOC_PROJECTION
         )
         return CandidateProfileOut.model_validate(updated_candidate_doc)
     else:
@@ -68,6 +68,10 @@ async def register(user: UserCreate):
         # --- Set initial status based on role ---
         if user.role == "candidate":
             user_doc["mapping_status"] = "pending_resume"
+            # Search fields start with concrete empty values (not missing/null) so search filters stay index-friendly.
+            # resume_text stays unset (null in the profile) until upload; keyword search already skips it via $gt "".
+            user_doc["estimated_yoe"] = 0.0
+            user_doc["extracted_skills_list"] = []
             # Other candidate fields like assigned_hr_id default to None via model
         elif user.role == "hr":
             user_doc["hr_status"] = "pending_profile"
@@ -1,5 +1,6 @@
 # LLM_interviewer/server/app/api/routes/candidates.py
 
+import asyncio
 import shutil
 import uuid
 import logging
@@ -14,7 +15,7 @@ from fastapi import (
     status,
     Query
 )
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.asynchronous.database import AsyncDatabase
 from pydantic import BaseModel, Field, model_validator
 from bson import ObjectId
 from bson.errors import InvalidId
@@ -25,11 +26,12 @@ import aiofiles.os
 # Core, models, schemas, db
 from app.core.security import get_current_active_user
 from app.models.user import User, CandidateMappingStatus
-from app.db.mongodb import mongodb
+from app.db.mongodb import mongodb, USER_DOC_PROJECTION
 from app.core.config import settings
 from app.services.resume_parser import parse_resume, ResumeParserError
 # Import analyzer service (called during resume upload)
-from app.services.resume_analyzer_service import resume_analyzer_service
+from app.services.resume_analyzer_service import normalize_skills, resume_analyzer_service
+from app.services.search_service import extract_resume_phrases
 
 # Import updated/specific schemas
 from app.schemas.user import PyObjectIdStr, CandidateProfileOut, CandidateProfileUpdate
@@ -64,7 +66,7 @@ def get_object_id(id_str: str) -> ObjectId:
 
 async def require_candidate(current_user: User = Depends(get_current_active_user)):
     if current_user.role != "candidate": raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operation not permitted.")
-    db = mongodb.get_db(); user_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one({"_id": get_object_id(current_user.id)})
+    db = mongodb.get_db(); user_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one({"_id": get_object_id(current_user.id)}, projection=USER_DOC_PROJECTION)
     if not user_doc: raise HTTPException(status_code=404, detail="Candidate user not found.")
     return User.model_validate(user_doc)
 # --- End Configuration & Helpers ---
@@ -75,7 +77,7 @@ async def require_candidate(current_user: User = Depends(get_current_active_user
 async def upload_resume(
     resume: UploadFile = File(...),
     current_candidate_user: User = Depends(require_candidate), # Renamed for clarity
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     """
     Handles resume upload for the candidate.
@@ -127,11 +129,19 @@ async def upload_resume(
         await resume.close()
 
     # --- Database Update ---
+    # Phrase tokens for indexed keyword search (see SEARCH_PHRASE_INDEX_ENABLED); CPU-bound, so off the event loop
+    resume_phrases = (
+        await asyncio.to_thread(extract_resume_phrases, parsed_content)
+        if settings.SEARCH_PHRASE_INDEX_ENABLED and parsed_content else None
+    )
+    extracted_skills = analysis_result.get("extracted_skills_list")
     update_data = {
         "resume_path": str(file_location.resolve()),
         "resume_text": parsed_content, 
-        "extracted_skills_list": analysis_result.get("extracted_skills_list"),
+        # Stored normalized (lowercase, deduped) so search can compare skill sets without re-normalizing
+        "extracted_skills_list": normalize_skills(extracted_skills) if extracted_skills is not None else None,
         "estimated_yoe": analysis_result.get("estimated_yoe"),
+        "resume_phrases": resume_phrases,
         "updated_at": datetime.now(timezone.utc)
     }
     
@@ -168,7 +178,7 @@ async def upload_resume(
             raise HTTPException(status_code=404, detail="Candidate not found during update.")
         
         logger.info(f"Updated candidate {current_candidate_user.username}. Parse status: {parsing_status}")
-        updated_user_doc = await users_collection.find_one({"_id": current_candidate_user.id})
+        updated_user_doc = await users_collection.find_one({"_id": current_candidate_user.id}, projection=USER_DOC_PROJECTION)
         if not updated_user_doc: 
             raise HTTPException(status_code=500, detail="Failed to retrieve updated candidate profile.")
         return CandidateProfileOut.model_validate(updated_user_doc)
@@ -187,7 +197,7 @@ async def get_candidate_profile(current_candidate: User = Depends(require_candid
     return CandidateProfileOut.model_validate(current_candidate)
 
 @router.put("/profile", response_model=CandidateProfileOut)
-async def update_candidate_profile(profile_update: CandidateProfileUpdate, current_candidate: User = Depends(require_candidate), db: AsyncIOMotorClient = Depends(mongodb.get_db)):
+async def update_candidate_profile(profile_update: CandidateProfileUpdate, current_candidate: User = Depends(require_candidate), db: AsyncDatabase = Depends(mongodb.get_db)):
     logger.info(f"Attempting update profile for candidate: {current_candidate.username}")
     update_data = profile_update.model_dump(exclude_unset=True)
     if not update_data: raise HTTPException(status_code=400, detail="No update data.")
@@ -199,7 +209,7 @@ async def update_candidate_profile(profile_update: CandidateProfileUpdate, curre
         users_collection = db[settings.MONGODB_COLLECTION_USERS]
         res = await users_collection.update_one({"_id": current_candidate.id}, {"$set": update_data})
         if res.matched_count == 0: raise HTTPException(status_code=404, detail="Candidate not found.")
-        updated_user_doc = await users_collection.find_one({"_id": current_candidate.id})
+        updated_user_doc = await users_collection.find_one({"_id": current_candidate.id}, projection=USER_DOC_PROJECTION)
         return CandidateProfileOut.model_validate(updated_user_doc)
     except Exception as e: logger.error(f"Error updating profile: {e}", exc_info=True); raise HTTPException(status_code=500)
 
@@ -209,7 +219,7 @@ async def update_candidate_profile(profile_update: CandidateProfileUpdate, curre
 @router.get("/messages", response_model=List[MessageOut])
 async def get_candidate_messages(
     current_candidate: User = Depends(require_candidate),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
     limit: int = Query(20, ge=1, le=100), 
     skip: int = Query(0, ge=0)
 ):
@@ -239,7 +249,7 @@ async def get_candidate_messages(
         }}
     ]
     try:
-        message_cursor = messages_collection.aggregate(pipeline)
+        message_cursor = await messages_collection.aggregate(pipeline)
         messages_data = await message_cursor.to_list(length=limit)
         response_list = [MessageOut.model_validate(msg) for msg in messages_data]
         return response_list
@@ -252,7 +262,7 @@ async def get_candidate_messages(
 async def mark_messages_as_read(
     read_request: MarkReadRequest,
     current_candidate: User = Depends(require_candidate),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     logger.info(f"Candidate {current_candidate.username} marking messages as read: {read_request.message_ids}")
     messages_collection = db["messages"]
@@ -13,7 +13,7 @@ from fastapi import (
     Body,
     Query,
 )
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.asynchronous.database import AsyncDatabase
 from bson import ObjectId
 from datetime import datetime, timezone
 from pydantic import BaseModel, Field # Added Pydantic imports
@@ -32,17 +32,18 @@ from app.schemas.application_request import HRMappingRequestOut
 from app.schemas.search import RankedCandidate
 from app.schemas.message import MessageOut, MessageContentCreate 
 
-from app.db.mongodb import mongodb
+from app.db.mongodb import mongodb, USER_DOC_PROJECTION
 from app.core.config import settings
 
 # Import Services
 from app.services.invitation_service import InvitationService, InvitationError
-from app.services.search_service import SearchService
+from app.services.search_service import SearchService, extract_resume_phrases, get_search_service
 # RankedCandidate is now imported from app.schemas.search (already listed above)
 
 # Import resume parser AND analyzer
 from app.services.resume_parser import parse_resume, ResumeParserError
 from app.services.resume_analyzer_service import (
+    normalize_skills,
     resume_analyzer_service,
 )  # Import analyzer
 
@@ -86,7 +87,7 @@ async def require_hr(current_user_dep: User = Depends(get_current_active_user)):
         raise HTTPException(status_code=403, detail="Operation requires HR privileges.")
     db = mongodb.get_db()
     hr_user_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one(
-        {"_id": get_object_id(current_user_dep.id)}
+        {"_id": get_object_id(current_user_dep.id)}, projection=USER_DOC_PROJECTION
     )
     if not hr_user_doc:
         raise HTTPException(status_code=404, detail="HR user not found.")
@@ -120,7 +121,7 @@ router = APIRouter(prefix="/hr", tags=["HR"], dependencies=[Depends(require_hr)]
 async def update_hr_profile_details(
     profile_data: HrProfileUpdate,
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     # ... (implementation remains same) ...
     logger.info(f"HR {current_hr_user.username} updating profile details.")
@@ -140,7 +141,7 @@ async def update_hr_profile_details(
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="HR User not found.")
     updated_user = await db[settings.MONGODB_COLLECTION_USERS].find_one(
-        {"_id": current_hr_user.id}
+        {"_id": current_hr_user.id}, projection=USER_DOC_PROJECTION
     )
     return HrProfileOut.model_validate(updated_user)
 
@@ -149,7 +150,7 @@ async def update_hr_profile_details(
 async def upload_hr_resume(
     resume: UploadFile = File(...),
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     """
     Allows an HR user to upload/update their resume.
@@ -231,12 +232,22 @@ async def upload_hr_resume(
     # --- End Save, Parse, Analyze ---
 
     # --- Database Update ---
+    # Phrase tokens for indexed keyword search (see SEARCH_PHRASE_INDEX_ENABLED); CPU-bound, so off the event loop
+    resume_phrases = (
+        await asyncio.to_thread(extract_resume_phrases, parsed_content)
+        if settings.SEARCH_PHRASE_INDEX_ENABLED and parsed_content else None
+    )
+    extracted_skills = analysis_result.get("extracted_skills_list")
     update_doc = {
         "resume_path": str(file_location.resolve()),
         "resume_text": parsed_content,  # Store parsed text
         # Store analysis results - ** ADJUST FIELD NAMES AS NEEDED **
-        "extracted_skills_list": analysis_result.get("extracted_skills_list"),
+        # Skills stored normalized (lowercase, deduped) so search can compare skill sets without re-normalizing
+        "extracted_skills_list": (
+            normalize_skills(extracted_skills) if extracted_skills is not None else None
+        ),
         "estimated_yoe": analysis_result.get("estimated_yoe"),
+        "resume_phrases": resume_phrases,
         "updated_at": datetime.now(timezone.utc),
     }
     # Remove analysis fields if they are None to avoid storing nulls explicitly unless desired
@@ -244,6 +255,8 @@ async def upload_hr_resume(
         del update_doc["extracted_skills_list"]
     if update_doc["estimated_yoe"] is None:
         del update_doc["estimated_yoe"]
+    if update_doc["resume_phrases"] is None:
+        del update_doc["resume_phrases"]
 
     # Check if profile is now complete (Resume uploaded AND YoE exists on record)
     # Use current_hr_user.years_of_experience which reflects DB state *before* this update for YoE check
@@ -274,7 +287,7 @@ async def upload_hr_resume(
             f"Updated HR {current_hr_user.username} resume/analysis info. Parse status: {parsing_status}"
         )
         updated_user = await db[settings.MONGODB_COLLECTION_USERS].find_one(
-            {"_id": current_hr_user.id}
+            {"_id": current_hr_user.id}, projection=USER_DOC_PROJECTION
         )
         return HrProfileOut.model_validate(updated_user)
     except Exception as db_e:
@@ -294,7 +307,7 @@ async def upload_hr_resume(
 @router.get("/admins", response_model=List[AdminBasicInfo])
 async def list_admins_for_application(
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     if current_hr_user.hr_status != "profile_complete":
         raise HTTPException(
@@ -317,7 +330,7 @@ async def list_admins_for_application(
 async def apply_to_admin(
     admin_id: str,
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     target_admin_oid = get_object_id(admin_id)
     logger.info(f"HR {current_hr_user.username} applying to Admin {admin_id}")
@@ -338,16 +351,16 @@ async def apply_to_admin(
 @router.get("/pending-admin-requests", response_model=List[HRMappingRequestOut])
 async def get_pending_admin_requests(
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     logger.info(f"HR {current_hr_user.username} fetching pending admin requests.")
     invitation_service = InvitationService(db=db)
     try:
-        pending_requests_data = await invitation_service.get_pending_requests_for_hr(
-            current_hr_user.id
-        )
         return [
-            HRMappingRequestOut.model_validate(req) for req in pending_requests_data
+            HRMappingRequestOut.model_validate(req)
+            async for req in invitation_service.get_pending_requests_for_hr(
+                current_hr_user.id
+            )
         ]
     except Exception as e:
         logger.error(f"Error fetching pending requests: {e}", exc_info=True)
@@ -358,7 +371,7 @@ async def get_pending_admin_requests(
 async def accept_admin_request(
     request_id: str,
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     request_oid = get_object_id(request_id)
     logger.info(f"HR {current_hr_user.username} accepting request {request_id}")
@@ -368,7 +381,7 @@ async def accept_admin_request(
             request_oid, current_hr_user
         ):
             updated_hr_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one(
-                {"_id": current_hr_user.id}
+                {"_id": current_hr_user.id}, projection=USER_DOC_PROJECTION
             )
             return HrProfileOut.model_validate(updated_hr_doc)
         else:
@@ -384,7 +397,7 @@ async def accept_admin_request(
 async def reject_admin_request(
     request_id: str,
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     request_oid = get_object_id(request_id)
     logger.info(f"HR {current_hr_user.username} rejecting request {request_id}")
@@ -406,7 +419,7 @@ async def reject_admin_request(
 @router.post("/unmap", response_model=HrProfileOut)
 async def unmap_from_admin(
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     logger.info(
         f"HR {current_hr_user.username} unmapping from Admin {current_hr_user.admin_manager_id}"
@@ -415,7 +428,7 @@ async def unmap_from_admin(
     try:
         if await invitation_service.hr_unmap(current_hr_user):
             updated_hr_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one(
-                {"_id": current_hr_user.id}
+                {"_id": current_hr_user.id}, projection=USER_DOC_PROJECTION
             )
             return HrProfileOut.model_validate(updated_hr_doc)
         else:
@@ -433,7 +446,7 @@ async def unmap_from_admin(
 @router.get("/search-candidates", response_model=List[RankedCandidate])
 async def search_candidates(
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    search_service: SearchService = Depends(get_search_service),
     keyword: Optional[str] = Query(None),
     required_skills: Optional[List[str]] = Query(None),
     yoe_min: Optional[int] = Query(None, ge=0),
@@ -445,11 +458,11 @@ async def search_candidates(
             status_code=403, detail="Action requires HR user to be mapped."
         )
     logger.info(f"Mapped HR {current_hr_user.username} searching candidates...")
-    search_service = SearchService(db=db)
     try:
         return await search_service.search_candidates(
             keyword=keyword,
-            required_skills=required_skills,
+            # Normalized once here, into the form stored skill lists use
+            required_skills_lower=normalize_skills(required_skills) if required_skills else None,
             yoe_min=yoe_min,
             limit=limit,
         )
@@ -463,7 +476,7 @@ async def send_candidate_invitation_message(
     candidate_id: str,
     message_create: MessageContentCreate,  # Changed to MessageContentCreate
     current_hr_user: User = Depends(require_hr),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db),
+    db: AsyncDatabase = Depends(mongodb.get_db),
 ):
     """Allows a mapped HR user to send an 'invitation message' to a candidate."""
     # --- Logic Implemented ---
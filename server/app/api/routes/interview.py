@@ -15,14 +15,14 @@ from app.core.security import get_current_active_user
 from app.models.user import User, CandidateMappingStatus, HrStatus # Import User and status literals
 # Import UserOut for dependency type hint where appropriate
 from app.schemas.user import UserOut, PyObjectIdStr # Import PyObjectIdStr for validation if needed
-from app.db.mongodb import mongodb
+from app.db.mongodb import mongodb, USER_DOC_PROJECTION
 from app.core.config import settings
 from app.services.gemini_service import gemini_service, GeminiServiceError
 from uuid import uuid4
 from datetime import datetime, timezone
 from bson import ObjectId
 from bson.errors import InvalidId
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.asynchronous.database import AsyncDatabase
 import asyncio # Import asyncio for placeholder sleeps
 
 # Configure logging
@@ -48,7 +48,7 @@ async def require_hr_or_admin(current_user_dep: User = Depends(get_current_activ
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operation not permitted. HR or Admin privileges required.")
     # Fetch full doc for potential checks within routes
     db = mongodb.get_db()
-    user_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one({"_id": get_object_id(current_user_dep.id)})
+    user_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one({"_id": get_object_id(current_user_dep.id)}, projection=USER_DOC_PROJECTION)
     if not user_doc:
         raise HTTPException(status_code=404, detail="Authenticated user not found in database.")
     
@@ -79,7 +79,7 @@ async def require_candidate(current_user_dep: User = Depends(get_current_active_
     if current_user_dep.role != "candidate":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operation not permitted. Candidate role required.")
     db = mongodb.get_db()
-    user_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one({"_id": get_object_id(current_user_dep.id)})
+    user_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one({"_id": get_object_id(current_user_dep.id)}, projection=USER_DOC_PROJECTION)
     if not user_doc:
         raise HTTPException(status_code=404, detail="Candidate user not found in database.")
     return User.model_validate(user_doc)
@@ -87,7 +87,7 @@ async def require_candidate(current_user_dep: User = Depends(get_current_active_
 
 
 @router.get("/default-questions", response_model=List[QuestionOut], tags=["Questions"])
-async def get_default_questions_endpoint(db: AsyncIOMotorClient = Depends(mongodb.get_db)):
+async def get_default_questions_endpoint(db: AsyncDatabase = Depends(mongodb.get_db)):
     # No changes needed here
     logger.info("Request received for default questions.")
     try:
@@ -108,7 +108,7 @@ async def schedule_interview(
     interview_data: InterviewCreate,
     # Use dependency that returns the full User model
     requesting_user: User = Depends(require_hr_or_admin),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     """
     Schedules an interview (HR/Admin only).
@@ -261,7 +261,7 @@ async def get_all_interviews(
     # Dependency returns User model instance
     current_user: User = Depends(require_hr_or_admin),
     status_filter: Optional[str] = None,
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same) ...
     logger.info(f"User {current_user.username} requesting all interviews. Status filter: {status_filter}")
@@ -283,7 +283,7 @@ async def get_all_interviews(
 @router.get("/results/all", response_model=List[InterviewOut], tags=["Admin & HR View"])
 async def get_all_completed_interviews(
     current_user: User = Depends(require_hr_or_admin),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same) ...
     logger.info(f"User {current_user.username} requesting all completed interview results.")
@@ -302,7 +302,7 @@ async def get_all_completed_interviews(
 async def submit_response(
     response_data: SingleResponseSubmit,
     candidate_user: User = Depends(require_candidate), # Fetches full User model
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same - candidate submits answer to scheduled interview) ...
     logger.info(f"Candidate {candidate_user.username} submitting single response for interview {response_data.interview_id}, question {response_data.question_id}")
@@ -379,7 +379,7 @@ async def submit_response(
 async def submit_all_responses(
     submission: SubmitAnswersRequest,
     candidate_user: User = Depends(require_candidate), # Fetches full User model
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same - candidate submits all answers to scheduled interview) ...
     interview_id = submission.interview_id
@@ -457,7 +457,7 @@ async def submit_all_responses(
 @router.get("/candidate/me", response_model=List[InterviewOut], tags=["Candidate Actions"])
 async def get_my_interviews(
     candidate_user: User = Depends(require_candidate), # Fetches full User model
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same) ...
     logger.info(f"Candidate {candidate_user.username} requesting their interviews.")
@@ -477,7 +477,7 @@ async def get_my_interviews(
 @router.get("/candidate/history", response_model=List[Dict[str, Any]], tags=["Candidate Actions"])
 async def get_candidate_interview_history(
     candidate_user: User = Depends(require_candidate), # Fetches full User model
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same) ...
     logger.info(f"Fetching interview history for candidate {candidate_user.username}")
@@ -547,7 +547,7 @@ async def get_single_interview_result(
     interview_id: str,
     # Use generic get_current_active_user, then check role inside
     current_user: User = Depends(get_current_active_user),
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same - fetches completed interview, checks role) ...
     logger.info(f"User {current_user.username} requesting result for interview {interview_id}")
@@ -619,7 +619,7 @@ async def submit_interview_results(
     interview_id: str,
     result_data: InterviewResultSubmit,
     hr_or_admin_user: User = Depends(require_hr_or_admin), # Fetches full User model
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same - HR/Admin submits feedback/scores) ...
     logger.info(f"User {hr_or_admin_user.username} submitting results (incl. per-response) for interview {interview_id}")
@@ -727,7 +727,7 @@ async def submit_interview_results(
 async def evaluate_single_response_ai(
     response_id: str,
     hr_or_admin_user: User = Depends(require_hr_or_admin), # Fetches full User model
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same - HR/Admin triggers AI eval) ...
     logger.info(f"User {hr_or_admin_user.username} triggering AI evaluation for response ID: {response_id}")
@@ -820,7 +820,7 @@ async def evaluate_single_response_ai(
 async def get_interview_details(
     interview_id: str,
     current_user: User = Depends(get_current_active_user), # Use generic dependency
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same - checks role inside) ...
     logger.info(f"User {current_user.username} requesting details for interview {interview_id}")
@@ -844,7 +844,7 @@ async def get_interview_details(
 async def get_interview_responses_list(
     interview_id: str,
     current_user: User = Depends(get_current_active_user), # Use generic dependency
-    db: AsyncIOMotorClient = Depends(mongodb.get_db)
+    db: AsyncDatabase = Depends(mongodb.get_db)
 ):
     # ... (implementation remains the same - checks role inside) ...
     logger.info(f"User {current_user.username} requesting responses for interview {interview_id}")
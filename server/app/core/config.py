@@ -67,6 +67,21 @@ class Settings(BaseSettings):
     ALLOWED_RESUME_EXTENSIONS: List[str] = ["pdf", "docx"]
     MAX_RESUME_SIZE_MB: int = 5
 
+    # --- Resume Analysis ---
+    RESUME_ANALYZER_USE_GPU: bool = False # Run spaCy on CUDA when available (falls back to CPU silently)
+    RESUME_SKILL_FAST_PATH_THRESHOLD: int = 25 # Skip spaCy NER once keyword matching alone finds this many skills
+    RESUME_FORCE_NER: bool = False # Always run NER, ignoring the fast-path threshold
+
+    # --- Search ---
+    SEARCH_TEXT_ENABLED: bool = True # Keyword ($text) search over resume_text; needs the text index ensured at startup
+    # Multi-word keywords as an indexed equality match on resume_phrases (2..N-word phrases stored at upload) instead
+    # of $text; single-word keywords still use $text. There is no text score, so phrase hits rank by skills/YoE.
+    # NOTE: phrases are only written on resume upload and nothing backfills them, so while enabled, users whose
+    # resume was uploaded before the flag was turned on don't match phrase keywords until they re-upload.
+    SEARCH_PHRASE_INDEX_ENABLED: bool = False
+    SEARCH_PHRASE_MAX_WORDS: int = 6
+    SEARCH_PHRASE_MAX_PHRASES: int = 2000 # Cap per user document (and multikey index entries per user)
+
     # --- Gemini Configuration ---
     GEMINI_API_KEY: Optional[str] = None
     GEMINI_MODEL_NAME: str = "gemini-1.5-flash-latest" # Note: Log showed gemini-1.5-pro, ensure this matches intended model
@@ -8,14 +8,14 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorClient # Added AsyncIOMotorClient
+from pymongo.asynchronous.database import AsyncDatabase
 from pydantic import ValidationError # For catching Pydantic validation errors
 from bson import ObjectId # Import ObjectId for checking _id
 
 # Import schemas and configuration
 from app.schemas.user import UserOut, TokenData
 from app.core.config import settings
-from app.db.mongodb import mongodb # Import the singleton instance
+from app.db.mongodb import mongodb, USER_DOC_PROJECTION # Import the singleton instance
 
 # --- Configuration ---
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -26,7 +26,7 @@ logger = logging.getLogger(__name__)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 # --- Database Dependency ---
-async def get_db() -> AsyncIOMotorDatabase:
+async def get_db() -> AsyncDatabase:
     """
     Dependency that returns the database instance from the mongodb singleton.
     This confirms the correct usage: depending on this function provides the DB handle.
@@ -73,7 +73,7 @@ async def get_db() -> AsyncIOMotorDatabase:
 
 
 # Type alias for dependency injection clarity
-CurrentDB = Annotated[AsyncIOMotorDatabase, Depends(get_db)]
+CurrentDB = Annotated[AsyncDatabase, Depends(get_db)]
 Token = Annotated[str, Depends(oauth2_scheme)]
 
 # --- Password Utilities ---
@@ -135,7 +135,7 @@ async def get_current_user(token: Token, db: CurrentDB) -> UserOut:
     if email: # Only proceed if email was decoded
         try:
             logger.debug(f"[AUTH_DEBUG] Attempting DB lookup for email: {email}")
-            user_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one({"email": email})
+            user_doc = await db[settings.MONGODB_COLLECTION_USERS].find_one({"email": email}, projection=USER_DOC_PROJECTION)
 
             if user_doc is None:
                 logger.warning(f"[AUTH_DEBUG] User NOT FOUND in DB for email: {email}")
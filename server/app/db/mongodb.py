@@ -3,25 +3,35 @@
 import logging
 from typing import Optional # Import Optional for type hinting
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import DuplicateKeyError, OperationFailure
 
 # Import settings for configuration
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Projection for reads of whole user documents: drops search-only fields (resume_phrases can hold thousands of strings)
+USER_DOC_PROJECTION = {"resume_phrases": 0}
+
 class MongoDB:
     """
     Singleton class to manage the MongoDB connection lifecycle.
     """
     # Add type hints for client and db attributes
-    client: Optional[AsyncIOMotorClient]
-    db: Optional[AsyncIOMotorDatabase]
+    client: Optional[AsyncMongoClient]
+    db: Optional[AsyncDatabase]
 
     def __init__(self):
         """Initializes the MongoDB manager with None client/db."""
         self.client = None
         self.db = None
+        # Set by ensure_indexes once the resume_text text index is known to exist; gates $text search
+        self.resume_text_search_enabled = False
+        # Set by ensure_indexes when some pending mapping rows couldn't get hr_ref, so the unique
+        # one_pending_per_hr index doesn't cover every pending item; assume so until checked
+        self.pending_rows_without_hr_ref = True
         # Use settings directly for configuration
         self.mongodb_url = settings.MONGODB_URL
         self.mongodb_db_name = settings.MONGODB_DB
@@ -48,7 +58,7 @@ class MongoDB:
             connect_timeout = getattr(settings, 'MONGODB_CONNECT_TIMEOUT_MS', 5000)
             server_select_timeout = getattr(settings, 'MONGODB_SERVER_SELECTION_TIMEOUT_MS', 5000)
 
-            self.client = AsyncIOMotorClient(
+            self.client = AsyncMongoClient(
                 self.mongodb_url,
                 serverSelectionTimeoutMS=server_select_timeout,
                 connectTimeoutMS=connect_timeout,
@@ -68,17 +78,126 @@ class MongoDB:
             # Re-raise the exception so the application lifespan knows connection failed
             raise
 
+    async def ensure_indexes(self):
+        """
+        Creates the indexes the service layer relies on. Safe to call on every startup:
+        create_index is a no-op when an identical index already exists, and an index that can't be
+        created (e.g. the same keys already indexed under another name) is logged rather than raised.
+        """
+        db = self.get_db()
+        requests_collection = db[settings.MONGODB_COLLECTION_HR_MAPPING_REQUESTS]
+        # Pending application/request lists: equality on target/type/status, ordered by created_at
+        await self._create_index(
+            requests_collection,
+            [("target_id", 1), ("request_type", 1), ("status", 1), ("created_at", 1)],
+            name="target_type_status_created"
+        )
+        # One pending application/request per HR user, enforced by the database: hr_ref is the HR side of
+        # the pair (requester for applications, target for requests). Rows written before hr_ref existed
+        # lack the field and are left out of the index so they can't collide on null.
+        if await self._create_index(
+            requests_collection,
+            [("hr_ref", 1)],
+            name="one_pending_per_hr",
+            unique=True,
+            partialFilterExpression={"status": "pending", "hr_ref": {"$exists": True}}
+        ):
+            self.pending_rows_without_hr_ref = await self._backfill_pending_hr_ref(requests_collection)
+        else:
+            logger.warning("one_pending_per_hr index unavailable; pending duplicates are checked by the service only.")
+
+        users_collection = db[settings.MONGODB_COLLECTION_USERS]
+        # Search filters: equality on role/status, range on YoE (also backs the YoE-ordered top-K)
+        await self._create_index(
+            users_collection,
+            [("role", 1), ("mapping_status", 1), ("estimated_yoe", 1)],
+            name="role_mapping_status_yoe"
+        )
+        await self._create_index(
+            users_collection,
+            [("role", 1), ("hr_status", 1), ("years_of_experience", 1)],
+            name="role_hr_status_yoe"
+        )
+        # Multikey index for the required-skills $in filter
+        await self._create_index(users_collection, [("extracted_skills_list", 1)], name="extracted_skills")
+        if settings.SEARCH_PHRASE_INDEX_ENABLED:
+            # Keyword search as an equality seek on the stored phrase tokens, next to the candidate filters
+            await self._create_index(
+                users_collection,
+                [("role", 1), ("mapping_status", 1), ("resume_phrases", 1)],
+                name="role_mapping_status_phrases"
+            )
+        if settings.SEARCH_TEXT_ENABLED:
+            self.resume_text_search_enabled = await self._ensure_resume_text_index(users_collection)
+        else:
+            logger.info("Resume text search disabled by settings; keyword searches will return no results.")
+        logger.info("MongoDB indexes ensured.")
+
+    async def _create_index(self, collection, keys, **kwargs) -> bool:
+        """ Creates one index, logging instead of raising if the server rejects it. Returns whether it was created. """
+        try:
+            await collection.create_index(keys, **kwargs)
+            return True
+        except OperationFailure as e:
+            # e.g. IndexOptionsConflict when an equivalent index exists under another name; startup carries on
+            logger.error(f"Failed to create index '{kwargs.get('name')}' on {collection.name}: {e}")
+            return False
+
+    async def _backfill_pending_hr_ref(self, requests_collection) -> bool:
+        """
+        Sets hr_ref on pending rows written before the field existed, so one_pending_per_hr covers them.
+        Oldest first: a second legacy pending row for the same HR hits the unique index and is left as is.
+        Returns whether any pending row is still without hr_ref.
+        """
+        left_without_ref = 0
+        legacy_rows = requests_collection.find(
+            {"status": "pending", "hr_ref": {"$exists": False}},
+            projection={"request_type": 1, "requester_id": 1, "target_id": 1}
+        ).sort("created_at", 1)
+        async for row in legacy_rows:
+            hr_ref = row.get("requester_id") if row.get("request_type") == "application" else row.get("target_id")
+            try:
+                await requests_collection.update_one(
+                    {"_id": row["_id"], "hr_ref": {"$exists": False}}, {"$set": {"hr_ref": hr_ref}}
+                )
+            except DuplicateKeyError:
+                left_without_ref += 1
+                logger.warning(f"Pending mapping item {row['_id']} duplicates another pending item for HR {hr_ref}; left without hr_ref.")
+        if left_without_ref:
+            logger.warning(f"{left_without_ref} pending mapping item(s) not covered by the one-pending-per-HR index.")
+        return left_without_ref > 0
+
+    async def _ensure_resume_text_index(self, users_collection) -> bool:
+        """ Creates the resume_text text index. Returns whether a usable text index exists on the collection. """
+        try:
+            await users_collection.create_index(
+                [("resume_text", "text")],
+                name="resume_text_search",
+                weights={"resume_text": 10},
+                default_language="english"
+            )
+            return True
+        except OperationFailure as e:
+            # A collection allows only one text index; accept a pre-existing one created under another name/options
+            index_info = await users_collection.index_information()
+            if any(key_type == "text" for info in index_info.values() for _, key_type in info["key"]):
+                logger.warning(f"Using existing text index on users collection (could not create 'resume_text_search': {e})")
+                return True
+            logger.error(f"Failed to create resume_text text index; keyword search disabled: {e}", exc_info=True)
+            return False
+
     async def close(self):
         """Closes the MongoDB connection and resets client/db attributes."""
         if self.client:
-            self.client.close()
+            await self.client.close()
             self.client = None
             self.db = None
+            self.resume_text_search_enabled = False
             logger.info("MongoDB connection closed.")
         else:
             logger.info("No active MongoDB connection to close.")
 
-    def get_db(self) -> AsyncIOMotorDatabase:
+    def get_db(self) -> AsyncDatabase:
         """
         Returns the database instance.
 
@@ -10,6 +10,8 @@ from fastapi.middleware.cors import CORSMiddleware
 # Import application components
 from app.core.config import settings
 from app.db.mongodb import mongodb # Import the singleton instance
+from app.services.invitation_service import drain_pending_cleanups
+from app.services.search_service import get_search_service
 
 # Import API routers
 # --- ADD hr to imports ---
@@ -51,6 +53,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         await mongodb.connect()
         db_connected = True
         logger.info("MongoDB connection successful.")
+        await mongodb.ensure_indexes()
 
         if SEEDING_AVAILABLE and not settings.TESTING_MODE:
             logger.info("Attempting to run consolidated database seeding...")
@@ -68,7 +71,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     finally:
         logger.info("Application shutdown sequence initiated...")
         if db_connected:
+            await drain_pending_cleanups()
             await mongodb.close()
+            get_search_service.cache_clear() # Its collection handle belongs to the closed client
             logger.info("MongoDB connection closed.")
         else:
             logger.warning("Skipping MongoDB close sequence as connection was not established.")
@@ -1,19 +1,62 @@
 # LLM_interviewer/server/app/services/invitation_service.py
 
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, AsyncIterator
 from datetime import datetime, timezone # Make sure timezone is imported
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient # Import for type hint
+from cachetools import TTLCache
+from pymongo import ReturnDocument, UpdateMany
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import DuplicateKeyError
 
 from app.db.mongodb import mongodb
 from app.core.config import settings
-from app.models.user import User, HrStatus # Import User model and statuses
+from app.models.user import User # Import User model
 # Import the model for the requests/applications collection
-from app.models.application_request import HRMappingRequest, RequestMappingStatus, RequestMappingType
+from app.models.application_request import HRMappingRequest
 
 logger = logging.getLogger(__name__)
 
+# Short-lived, process-wide cache of confirmed (collection, _id, role) existence checks. Only the fact that a user
+# holds a role is cached (roles never change), never the document: status fields are written from many routes,
+# so they're always read fresh. The service is instantiated per request, so the cache lives at module level.
+_USER_ROLE_CACHE_TTL_SECONDS = 10
+_user_role_cache: TTLCache = TTLCache(maxsize=1024, ttl=_USER_ROLE_CACHE_TTL_SECONDS)
+
+# Strong references to in-flight background cleanups (the event loop only keeps weak ones),
+# also used to drain them on shutdown.
+_pending_cleanup_tasks: Set[asyncio.Task] = set()
+
+def _on_cleanup_done(task: asyncio.Task) -> None:
+    _pending_cleanup_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.error(f"Background cleanup of pending requests/applications failed: {exc}", exc_info=exc)
+
+async def drain_pending_cleanups() -> None:
+    """Waits for any background cleanup tasks still running; called on application shutdown."""
+    if _pending_cleanup_tasks:
+        logger.info(f"Waiting for {len(_pending_cleanup_tasks)} background cleanup task(s) to finish.")
+        await asyncio.gather(*_pending_cleanup_tasks, return_exceptions=True)
+
+# Constant query parts for the pending-list endpoints, built once at import instead of per call
+_PENDING_ITEM_PROJECTION = {
+    "_id": 1, "request_type": 1, "status": 1, "created_at": 1, "updated_at": 1,
+    "requester_id": 1, "target_id": 1
+}
+_ADMIN_APP_REQUESTER_PROJECTION = dict.fromkeys((
+    "username", "email", "role", "created_at", "hr_status",
+    "years_of_experience", "company", "resume_path", "admin_manager_id"
+), 1)
+_HR_REQ_REQUESTER_PROJECTION = dict.fromkeys(("username", "email", "role", "created_at"), 1)
+# Requester lookups are batched per this many streamed request rows
+_REQUESTER_LOOKUP_BATCH_SIZE = 100
+# resume_text can be tens of KB and resume_phrases thousands of strings; neither is needed for role/status checks
+_USER_LOOKUP_PROJECTION = {"resume_text": 0, "resume_phrases": 0}
+
 # Define a potential custom exception
 class InvitationError(Exception):
     pass
@@ -24,73 +67,87 @@ class InvitationService:
     Handles creation, status updates, and validation related to the mapping workflow.
     """
 
-    def __init__(self, db: Optional[AsyncIOMotorClient] = None): # Correct type hint for db client/db object
+    def __init__(self, db: Optional[AsyncDatabase] = None):
         # Allow injecting db dependency, otherwise get default
         self.db = db if db is not None else mongodb.get_db() # Corrected truthiness check
         if self.db is None:
              # Added check in case mongodb singleton isn't connected when service is instantiated
              raise RuntimeError("Database not available in InvitationService.")
         self.user_collection = self.db[settings.MONGODB_COLLECTION_USERS]
-        # Use a defined collection name (can be from settings or hardcoded)
-        self.request_collection_name = "hr_mapping_requests" # Example name
+        # Same collection ensure_indexes builds one_pending_per_hr on
+        self.request_collection_name = settings.MONGODB_COLLECTION_HR_MAPPING_REQUESTS
         self.request_collection = self.db[self.request_collection_name]
 
-    async def _check_existing_pending(self, hr_user_id: ObjectId) -> bool:
-        """Checks if an HR user has any pending outgoing app or incoming request."""
-        pending_item = await self.request_collection.find_one({
-            "status": "pending",
-            "$or": [
-                {"requester_id": hr_user_id, "request_type": "application"},
-                {"target_id": hr_user_id, "request_type": "request"}
-            ]
-        })
-        if pending_item:
-            logger.warning(f"HR User {hr_user_id} already has a pending application or request ({pending_item['_id']}).")
+    async def _user_has_role(self, user_oid: ObjectId, role: str) -> bool:
+        """Whether a user with this _id and role exists; positive answers are served from a short-TTL cache."""
+        cache_key = (self.user_collection.name, user_oid, role)
+        if cache_key in _user_role_cache:
             return True
-        return False
+        if await self.user_collection.find_one({"_id": user_oid, "role": role}, projection={"_id": 1}) is None:
+            return False
+        _user_role_cache[cache_key] = True
+        return True
+
+    async def _has_other_pending(self, hr_user_id: ObjectId) -> bool:
+        """Whether an HR user still has a pending outgoing application or incoming request."""
+        pending_item = await self.request_collection.find_one(
+            {
+                "status": "pending",
+                "$or": [
+                    {"requester_id": hr_user_id, "request_type": "application"},
+                    {"target_id": hr_user_id, "request_type": "request"}
+                ]
+            },
+            projection={"_id": 1}
+        )
+        return pending_item is not None
 
     async def _cleanup_pending_for_user(self, hr_user_id: ObjectId, accepted_request_id: ObjectId):
         """Cancels/rejects other pending items for an HR user when one item (request or app) is accepted."""
         now = datetime.now(timezone.utc)
         logger.info(f"Cleaning up other pending requests/applications for HR {hr_user_id}, excluding accepted item {accepted_request_id}")
 
-        # Cancel pending outgoing applications from this HR (excluding the accepted one if it was an app)
-        await self.request_collection.update_many(
-             {
-                 "_id": {"$ne": accepted_request_id}, # Exclude the one just accepted
-                 "requester_id": hr_user_id,
-                 "status": "pending",
-                 "request_type": "application"
-             },
-             {"$set": {"status": "cancelled", "updated_at": now}}
-        )
-        # Reject pending incoming requests to this HR (excluding the accepted one if it was a req)
-        await self.request_collection.update_many(
-             {
-                 "_id": {"$ne": accepted_request_id}, # Exclude the one just accepted
-                 "target_id": hr_user_id,
-                 "status": "pending",
-                 "request_type": "request"
-             },
-             {"$set": {"status": "rejected", "updated_at": now}}
-        )
-        logger.info(f"Cleanup complete for HR {hr_user_id}.")
+        # Both fix-ups target the same collection, so send them as one ordered batch (one round trip)
+        cleanup_ops = [
+            # Cancel pending outgoing applications from this HR (excluding the accepted one if it was an app)
+            UpdateMany(
+                {
+                    "_id": {"$ne": accepted_request_id}, # Exclude the one just accepted
+                    "requester_id": hr_user_id,
+                    "status": "pending",
+                    "request_type": "application"
+                },
+                {"$set": {"status": "cancelled", "updated_at": now}}
+            ),
+            # Reject pending incoming requests to this HR (excluding the accepted one if it was a req)
+            UpdateMany(
+                {
+                    "_id": {"$ne": accepted_request_id}, # Exclude the one just accepted
+                    "target_id": hr_user_id,
+                    "status": "pending",
+                    "request_type": "request"
+                },
+                {"$set": {"status": "rejected", "updated_at": now}}
+            ),
+        ]
+        cleanup_result = await self.request_collection.bulk_write(cleanup_ops, ordered=True)
+        logger.info(f"Cleanup complete for HR {hr_user_id} ({cleanup_result.modified_count} pending item(s) closed).")
 
 
     async def create_hr_application(self, hr_user: User, target_admin_id: ObjectId) -> HRMappingRequest:
         """HR applies to an Admin."""
         if hr_user.role != "hr": raise InvitationError("Only HR users can apply.")
         if hr_user.hr_status != "profile_complete": raise InvitationError(f"HR user status must be 'profile_complete' to apply (is {hr_user.hr_status}).")
-        if await self._check_existing_pending(hr_user.id): raise InvitationError("HR user already has a pending application or request.")
 
-        target_admin = await self.user_collection.find_one({"_id": target_admin_id, "role": "admin"})
-        if not target_admin: raise InvitationError(f"Target Admin {target_admin_id} not found or is not an Admin.")
+        if not await self._user_has_role(target_admin_id, "admin"): raise InvitationError(f"Target Admin {target_admin_id} not found or is not an Admin.")
 
         logger.info(f"Creating application from HR {hr_user.id} to Admin {target_admin_id}")
 
         now = datetime.now(timezone.utc)
         application_doc = {
+            "_id": ObjectId(), # Pre-assigned so the insert and the status update can run concurrently
             "request_type": "application",
+            "hr_ref": hr_user.id, # HR side of the pair; unique among pending items (see ensure_indexes)
             "requester_id": hr_user.id,
             "requester_role": "hr",
             "target_id": target_admin_id,
@@ -99,62 +156,64 @@ class InvitationService:
             "created_at": now,
             "updated_at": now
         }
-        insert_result = await self.request_collection.insert_one(application_doc)
-        if not insert_result.acknowledged:
-            raise InvitationError("Failed to create application record in database.")
-        created_doc = await self.request_collection.find_one({"_id": insert_result.inserted_id})
-        if not created_doc:
-             raise InvitationError("Failed to retrieve created application record.")
-
-
-        # Update HR user status
-        update_result = await self.user_collection.update_one(
-            {"_id": hr_user.id},
-            {"$set": {"hr_status": "application_pending", "updated_at": now}}
+        # Insert the application and update HR user status in parallel; they touch different collections
+        insert_outcome, update_outcome = await asyncio.gather(
+            self.request_collection.insert_one(application_doc),
+            self.user_collection.update_one(
+                {"_id": hr_user.id, "hr_status": "profile_complete"},
+                {"$set": {"hr_status": "application_pending", "updated_at": now}}
+            ),
+            return_exceptions=True
         )
-        if update_result.modified_count == 0:
-             logger.error(f"Failed to update HR user {hr_user.id} status after creating application {insert_result.inserted_id}")
-             await self.request_collection.delete_one({"_id": insert_result.inserted_id})
+        insert_ok = not isinstance(insert_outcome, BaseException) and insert_outcome.acknowledged
+        update_ok = not isinstance(update_outcome, BaseException) and update_outcome.modified_count == 1
+
+        if not insert_ok:
+            logger.error(f"Failed to insert application from HR {hr_user.id} to Admin {target_admin_id}: {insert_outcome}")
+            if update_ok: # Roll back the status change that went through
+                await self.user_collection.update_one(
+                    {"_id": hr_user.id, "hr_status": "application_pending"},
+                    {"$set": {"hr_status": "profile_complete", "updated_at": now}}
+                )
+            if isinstance(insert_outcome, DuplicateKeyError):
+                raise InvitationError("HR user already has a pending application or request.")
+            raise InvitationError("Failed to create application record in database.")
+        if not update_ok:
+             logger.error(f"Failed to update HR user {hr_user.id} status after creating application {application_doc['_id']}: {update_outcome}")
+             await self.request_collection.delete_one({"_id": application_doc["_id"]})
+             if not isinstance(update_outcome, BaseException):
+                 # The conditional update didn't match: re-read once to tell a concurrent status change apart
+                 hr_user_current = await self.user_collection.find_one({"_id": hr_user.id}, projection={"hr_status": 1})
+                 current_status = hr_user_current.get("hr_status") if hr_user_current else None
+                 if current_status != "profile_complete":
+                     raise InvitationError(f"HR user status must be 'profile_complete' to apply (is {current_status}).")
              raise InvitationError("Failed to update HR user status.")
 
-        return HRMappingRequest.model_validate(created_doc)
+        return HRMappingRequest.model_validate(application_doc)
 
 
     async def create_admin_request(self, admin_user: User, target_hr_id: ObjectId) -> HRMappingRequest:
         """Admin sends mapping request to HR."""
         if admin_user.role != "admin": raise InvitationError("Only Admin users can send requests.")
 
-        target_hr_doc_initial_fetch = await self.user_collection.find_one({"_id": target_hr_id, "role": "hr"})
+        # Fresh read: hr_status is changed by profile/upload/admin routes as well as by this service
+        target_hr_doc_initial_fetch = await self.user_collection.find_one(
+            {"_id": target_hr_id, "role": "hr"}, projection={"hr_status": 1}
+        )
         if not target_hr_doc_initial_fetch: raise InvitationError(f"Target HR {target_hr_id} not found or is not an HR user.")
 
-        # Convert string OIDs to ObjectId before Pydantic validation for relevant fields
-        if "admin_manager_id" in target_hr_doc_initial_fetch and isinstance(target_hr_doc_initial_fetch["admin_manager_id"], str):
-            try:
-                target_hr_doc_initial_fetch["admin_manager_id"] = ObjectId(target_hr_doc_initial_fetch["admin_manager_id"])
-            except Exception: # Handle invalid ObjectId string if necessary, though DB should store valid ones
-                logger.error(f"Invalid ObjectId string for admin_manager_id: {target_hr_doc_initial_fetch['admin_manager_id']}")
-                # Decide on error handling: raise, or set to None, or let validation fail
-                pass # Let Pydantic catch it if it's truly invalid and not just a string OID
-        
-        if "assigned_hr_id" in target_hr_doc_initial_fetch and isinstance(target_hr_doc_initial_fetch["assigned_hr_id"], str): # Though less relevant for HR model directly
-            try:
-                target_hr_doc_initial_fetch["assigned_hr_id"] = ObjectId(target_hr_doc_initial_fetch["assigned_hr_id"])
-            except Exception:
-                pass
-
-
-        target_hr_model = User.model_validate(target_hr_doc_initial_fetch) 
-        # Now check the status *after* successful validation
-        if target_hr_model.hr_status == "mapped": # Check if already mapped
+        # Only hr_status is inspected here, so read it straight off the document instead of validating a User model
+        target_hr_status = target_hr_doc_initial_fetch.get("hr_status")
+        if target_hr_status == "mapped": # Check if already mapped
             raise InvitationError(f"Target HR {target_hr_id} is already mapped to an admin.")
-        if target_hr_model.hr_status != "profile_complete": raise InvitationError(f"Target HR status must be 'profile_complete' to receive request (is {target_hr_model.hr_status}).")
-        if await self._check_existing_pending(target_hr_id): raise InvitationError("Target HR user already has a pending application or request.")
+        if target_hr_status != "profile_complete": raise InvitationError(f"Target HR status must be 'profile_complete' to receive request (is {target_hr_status}).")
 
         logger.info(f"Creating mapping request from Admin {admin_user.id} to HR {target_hr_id}")
         now = datetime.now(timezone.utc)
 
         request_doc = {
             "request_type": "request",
+            "hr_ref": target_hr_id, # HR side of the pair; unique among pending items (see ensure_indexes)
             "requester_id": admin_user.id,
             "requester_role": "admin",
             "target_id": target_hr_id,
@@ -163,74 +222,49 @@ class InvitationService:
             "created_at": now,
             "updated_at": now
         }
-        insert_result = await self.request_collection.insert_one(request_doc)
+        try:
+            insert_result = await self.request_collection.insert_one(request_doc) # Sets request_doc["_id"]
+        except DuplicateKeyError:
+            raise InvitationError("Target HR user already has a pending application or request.")
         if not insert_result.acknowledged:
             raise InvitationError("Failed to create request record in database.")
-        created_doc = await self.request_collection.find_one({"_id": insert_result.inserted_id})
-        if not created_doc:
-             raise InvitationError("Failed to retrieve created request record.")
-
-        # Update HR user status - with enhanced diagnostics
-        logger.info(f"Attempting to update HR user {target_hr_id} for request {created_doc['_id']}")
-
-        # Step 1: Confirm user exists with this ID
-        hr_user_exists_check = await self.user_collection.find_one({"_id": target_hr_id})
-        if not hr_user_exists_check:
-            logger.error(f"CRITICAL ERROR: HR User {target_hr_id} NOT FOUND by _id query right before update.")
-            await self.request_collection.delete_one({"_id": insert_result.inserted_id})
-            raise InvitationError(f"HR User {target_hr_id} not found by _id immediately before update.")
-
-        logger.info(f"DIAGNOSTIC: HR User {target_hr_id} exists. Current document: {hr_user_exists_check}")
-
-        # Step 2: Confirm user exists with this ID AND expected status for update
-        # This is the crucial check. If this fails, the document state is not what we expect.
-        update_filter_for_check = {"_id": target_hr_id, "hr_status": "profile_complete"}
-        hr_user_with_status_check = await self.user_collection.find_one(update_filter_for_check)
-        
-        if not hr_user_with_status_check:
-            logger.error(
-                f"CRITICAL ERROR: HR User {target_hr_id} with hr_status 'profile_complete' NOT FOUND by compound query {update_filter_for_check}. "
-                f"Actual status from simple _id query: {hr_user_exists_check.get('hr_status')}. "
-                f"Document from simple _id query: {hr_user_exists_check}."
-            )
-            await self.request_collection.delete_one({"_id": insert_result.inserted_id})
-            raise InvitationError(f"HR User {target_hr_id} not in 'profile_complete' state for update. Actual: {hr_user_exists_check.get('hr_status')}")
-        
-        logger.info(f"DIAGNOSTIC: HR User {target_hr_id} confirmed with hr_status 'profile_complete' by find_one with filter {update_filter_for_check}: {hr_user_with_status_check}")
 
-        
-        logger.info(f"DIAGNOSTIC: HR User {target_hr_id} confirmed with hr_status 'profile_complete' by find_one with filter {update_filter_for_check}: {hr_user_with_status_check}")
+        # Update HR user status. The filter encodes the precondition, so no pre-update reads are needed;
+        # matched_count == 0 means the user vanished or left 'profile_complete' since the initial fetch.
+        logger.info(f"Attempting to update HR user {target_hr_id} for request {insert_result.inserted_id}")
+        update_filter = {"_id": target_hr_id, "hr_status": "profile_complete"}
+        update_result = await self.user_collection.update_one(
+            update_filter,
+            {"$set": {"hr_status": "admin_request_pending", "updated_at": now}}
+        )
 
-        # Use the _id directly from the document we just confirmed exists with the correct status
-        update_filter = {"_id": hr_user_with_status_check["_id"], "hr_status": "profile_complete"}
-        update_operation = {"$set": {"hr_status": "admin_request_pending", "updated_at": now}}
-        
-        logger.info(f"Attempting update on user {hr_user_with_status_check['_id']} with filter: {update_filter} and operation: {update_operation}")
-        update_result = await self.user_collection.update_one(update_filter, update_operation)
-        
-        if update_result.modified_count == 0: 
+        if update_result.matched_count == 0:
+            await self.request_collection.delete_one({"_id": insert_result.inserted_id}) # Rollback
+            # Only on failure: re-read once to report why the precondition didn't hold
+            hr_user_current = await self.user_collection.find_one({"_id": target_hr_id}, projection={"hr_status": 1})
+            if not hr_user_current:
+                logger.error(f"CRITICAL ERROR: HR User {target_hr_id} NOT FOUND by _id query during update.")
+                raise InvitationError(f"HR User {target_hr_id} not found by _id immediately before update.")
             logger.error(
-                f"Failed to update HR user {target_hr_id} (using _id from hr_user_with_status_check: {hr_user_with_status_check['_id']}) from 'profile_complete' to 'admin_request_pending'. "
-                f"Update filter used: {update_filter}. "
-                f"Update result: matched_count={update_result.matched_count}, modified_count={update_result.modified_count}. "
-                f"State of doc from initial service call fetch (target_hr_doc_initial_fetch): {target_hr_doc_initial_fetch}. " 
-                f"State of doc from pre-update check (hr_user_with_status_check): {hr_user_with_status_check}." # This is the one we used for the _id in update_filter
+                f"Failed to update HR user {target_hr_id} from 'profile_complete' to 'admin_request_pending'. "
+                f"Update filter used: {update_filter}. Actual status: {hr_user_current.get('hr_status')}."
             )
-            await self.request_collection.delete_one({"_id": insert_result.inserted_id}) # Rollback
-            raise InvitationError("Failed to update HR user status.")
+            raise InvitationError(f"HR User {target_hr_id} not in 'profile_complete' state for update. Actual: {hr_user_current.get('hr_status')}")
 
-        return HRMappingRequest.model_validate(created_doc)
+        return HRMappingRequest.model_validate(request_doc)
 
 
     async def accept_request_or_application(self, request_id: ObjectId, accepting_user: User) -> bool:
         """Handles acceptance logic for both applications and requests."""
         logger.info(f"User {accepting_user.id} attempting to accept request/application {request_id}")
         now = datetime.now(timezone.utc)
+        users, reqs = self.user_collection, self.request_collection
+        # accepting_user.id is PyObjectIdStr, which is str-like for ObjectId(); convert once and reuse
+        user_oid = ObjectId(accepting_user.id)
 
-        # accepting_user.id is PyObjectIdStr, which is str-like for ObjectId()
-        request_doc = await self.request_collection.find_one({
+        request_doc = await reqs.find_one({
             "_id": request_id,
-            "target_id": ObjectId(accepting_user.id), 
+            "target_id": user_oid,
             "status": "pending"
         })
         if not request_doc:
@@ -238,27 +272,26 @@ class InvitationService:
             raise InvitationError("Request/Application not found or already actioned.")
 
         hr_map_request = HRMappingRequest.model_validate(request_doc)
+        requester_oid = ObjectId(hr_map_request.requester_id)
 
         if hr_map_request.request_type == "application":
             if accepting_user.role != "admin": raise InvitationError("Only Admins can accept applications.")
-            admin_oid_for_db = accepting_user.id 
-            hr_oid_for_db = ObjectId(hr_map_request.requester_id) 
+            admin_oid_for_db = user_oid
+            hr_oid_for_db = requester_oid
         elif hr_map_request.request_type == "request":
             if accepting_user.role != "hr": raise InvitationError("Only HR can accept admin requests.")
-            hr_oid_for_db = accepting_user.id 
-            admin_oid_for_db = ObjectId(hr_map_request.requester_id) 
+            hr_oid_for_db = user_oid
+            admin_oid_for_db = requester_oid
         else:
             raise InvitationError("Invalid request type.")
 
-        hr_user_to_update = await self.user_collection.find_one({"_id": hr_oid_for_db})
+        hr_user_to_update = await users.find_one({"_id": hr_oid_for_db}, projection=_USER_LOOKUP_PROJECTION)
         if not hr_user_to_update:
             raise InvitationError(f"HR user {hr_oid_for_db} not found during acceptance process.")
         
         expected_pending_statuses = ["application_pending", "admin_request_pending"]
-        if hr_user_to_update.get("hr_status") not in expected_pending_statuses:
-            logger.error(f"HR user {hr_oid_for_db} status is '{hr_user_to_update.get('hr_status')}', not in {expected_pending_statuses}.")
 
-        hr_update_result = await self.user_collection.update_one(
+        hr_update_result = await users.update_one(
             {"_id": hr_oid_for_db, "hr_status": {"$in": expected_pending_statuses}}, 
             {"$set": {
                 "hr_status": "mapped",
@@ -270,18 +303,21 @@ class InvitationService:
             logger.error(f"HR user {hr_oid_for_db} not found or not in correct pending state for update during acceptance. Current status: {hr_user_to_update.get('hr_status')}")
             raise InvitationError("HR user not found or not in correct pending state for mapping.")
 
-        req_update_result = await self.request_collection.update_one(
+        req_update_result = await reqs.update_one(
             {"_id": request_id, "status": "pending"}, 
             {"$set": {"status": "accepted", "updated_at": now}}
         )
 
         if req_update_result.modified_count == 1:
              logger.info(f"Request/Application {request_id} successfully accepted. Cleaning up other pending items for HR {hr_oid_for_db}.")
-             await self._cleanup_pending_for_user(hr_oid_for_db, accepted_request_id=request_id)
+             # Best-effort fix-up of *other* rows; the caller doesn't need to wait for it
+             cleanup_task = asyncio.create_task(self._cleanup_pending_for_user(hr_oid_for_db, accepted_request_id=request_id))
+             _pending_cleanup_tasks.add(cleanup_task)
+             cleanup_task.add_done_callback(_on_cleanup_done)
              return True
         else:
              logger.error(f"Failed to update status for request/application {request_id} to accepted (matched_count: {req_update_result.matched_count}). HR status might have been updated to mapped. Manual check needed.")
-             await self.user_collection.update_one(
+             await users.update_one(
                  {"_id": hr_oid_for_db, "admin_manager_id": admin_oid_for_db, "hr_status": "mapped"}, 
                  {"$set": {"hr_status": hr_user_to_update.get("hr_status"), "admin_manager_id": hr_user_to_update.get("admin_manager_id"), "updated_at": now}}
              )
@@ -291,118 +327,117 @@ class InvitationService:
     async def reject_request_or_application(self, request_id: ObjectId, rejecting_user: User) -> bool:
         logger.info(f"User {rejecting_user.id} attempting to reject request/application {request_id}")
         now = datetime.now(timezone.utc)
-        # rejecting_user.id is PyObjectIdStr, which is str-like for ObjectId()
-        request_doc = await self.request_collection.find_one({
+        users, reqs = self.user_collection, self.request_collection
+        # rejecting_user.id is PyObjectIdStr, which is str-like for ObjectId(); convert once and reuse
+        user_oid = ObjectId(rejecting_user.id)
+        request_doc = await reqs.find_one({
             "_id": request_id,
-            "target_id": ObjectId(rejecting_user.id), 
+            "target_id": user_oid,
             "status": "pending"
         })
         if not request_doc:
             logger.error(f"Pending request/application {request_id} not found for target user {rejecting_user.id}.")
             raise InvitationError("Request/Application not found or already actioned.")
         hr_map_request = HRMappingRequest.model_validate(request_doc)
-        hr_oid_for_status_reset = ObjectId(hr_map_request.requester_id) if hr_map_request.request_type == "application" else ObjectId(hr_map_request.target_id)
-        req_update_result = await self.request_collection.update_one(
+        # For an admin request the HR is the target, i.e. the rejecting user we already converted
+        hr_oid_for_status_reset = ObjectId(hr_map_request.requester_id) if hr_map_request.request_type == "application" else user_oid
+        req_update_result = await reqs.update_one(
             {"_id": request_id, "status": "pending"}, 
             {"$set": {"status": "rejected", "updated_at": now}}
         )
         if req_update_result.modified_count == 0:
             logger.error(f"Failed to update status for request/application {request_id} to rejected.")
             raise InvitationError("Failed to update request/application status to rejected.")
-        if not await self._check_existing_pending(hr_oid_for_status_reset): 
-            hr_user_doc_before_reset = await self.user_collection.find_one({"_id": hr_oid_for_status_reset})
-            original_status = hr_user_doc_before_reset.get("hr_status") if hr_user_doc_before_reset else "unknown"
-            
-            hr_update_result = await self.user_collection.update_one(
-                {"_id": hr_oid_for_status_reset, "hr_status": {"$in": ["application_pending", "admin_request_pending"]}},
-                {"$set": {
-                    "hr_status": "profile_complete",
-                    "updated_at": now
-                }}
-            )
-            if hr_update_result.matched_count == 0:
-                logger.warning(f"HR user {hr_oid_for_status_reset} not found or status was not pending ('{original_status}') during rejection cleanup. No status reset needed or possible.")
-            else:
-                 logger.info(f"Reset HR user {hr_oid_for_status_reset} status from '{original_status}' to 'profile_complete' after rejection.")
+        # At most one item is pending per HR (unique hr_ref index), so none remain once this one is rejected.
+        # Legacy duplicates ensure_indexes couldn't backfill aren't covered; only then look for another pending item.
+        if mongodb.pending_rows_without_hr_ref and await self._has_other_pending(hr_oid_for_status_reset):
+            logger.info(f"HR user {hr_oid_for_status_reset} still has a pending application or request; status not reset.")
+            logger.info(f"Request/Application {request_id} successfully rejected.")
+            return True
+        # Conditional reset in one round trip; the pre-update image tells us what status was replaced
+        hr_user_doc_before_reset = await users.find_one_and_update(
+            {"_id": hr_oid_for_status_reset, "hr_status": {"$in": ["application_pending", "admin_request_pending"]}},
+            {"$set": {
+                "hr_status": "profile_complete",
+                "updated_at": now
+            }},
+            projection={"hr_status": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if hr_user_doc_before_reset is None:
+            logger.warning(f"HR user {hr_oid_for_status_reset} not found or status was not pending during rejection cleanup. No status reset needed or possible.")
         else:
-            logger.info(f"HR user {hr_oid_for_status_reset} still has other pending items after rejection, status not reset.")
+             logger.info(f"Reset HR user {hr_oid_for_status_reset} status from '{hr_user_doc_before_reset.get('hr_status')}' to 'profile_complete' after rejection.")
         logger.info(f"Request/Application {request_id} successfully rejected.")
         return True
 
 
-    async def get_pending_applications_for_admin(self, admin_id_str: str) -> List[Dict[str, Any]]: # Changed type hint
+    async def _attach_requester_info(self, request_docs: List[Dict[str, Any]], info_projection: Dict[str, int]) -> List[Dict[str, Any]]:
+        """Embeds basic requester details into each request doc using one batched user lookup."""
+        requester_ids = list({doc["requester_id"] for doc in request_docs})
+        if not requester_ids:
+            return request_docs
+        users = await self.user_collection.find(
+            {"_id": {"$in": requester_ids}},
+            projection=info_projection
+        ).to_list(length=None)
+        users_by_id = {user["_id"]: user for user in users}
+        for doc in request_docs:
+            user = users_by_id.get(doc["requester_id"])
+            # Missing requester: None rather than the {} the former $lookup/$project pipeline produced. Consumers
+            # validate into HRMappingRequestOut.requester_info (Optional[UserInfoBasic]); {} lacks its required
+            # fields and failed the whole listing, while None serializes as null.
+            doc["requester_info"] = (
+                {"id": user["_id"], **{field: user.get(field) for field in info_projection}} if user else None
+            )
+        return request_docs
+
+
+    async def _stream_with_requester_info(self, cursor, info_projection: Dict[str, int]) -> AsyncIterator[Dict[str, Any]]:
+        """Yields request docs from a cursor with requester_info attached, one batched user lookup per chunk."""
+        batch: List[Dict[str, Any]] = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= _REQUESTER_LOOKUP_BATCH_SIZE:
+                for enriched_doc in await self._attach_requester_info(batch, info_projection):
+                    yield enriched_doc
+                batch = []
+        if batch:
+            for enriched_doc in await self._attach_requester_info(batch, info_projection):
+                yield enriched_doc
+
+
+    async def get_pending_applications_for_admin(self, admin_id_str: str) -> AsyncIterator[Dict[str, Any]]:
          logger.debug(f"Fetching pending applications for Admin {admin_id_str}")
          # Ensure admin_id is an ObjectId for the query
          admin_oid = ObjectId(admin_id_str)
-         pipeline = [
-             {"$match": {
+         # Plain indexed find + batched $in lookups for requesters (cheaper than a $lookup join),
+         # streamed so the full backlog is never materialized here
+         cursor = self.request_collection.find(
+             {
                  "target_id": admin_oid,
                  "request_type": "application",
                  "status": "pending"
-             }},
-             {"$sort": {"created_at": 1}},
-             {"$lookup": { 
-                 "from": settings.MONGODB_COLLECTION_USERS,
-                 "localField": "requester_id",
-                 "foreignField": "_id",
-                 "as": "requester_info_doc"
-             }},
-             {"$unwind": { 
-                 "path": "$requester_info_doc",
-                 "preserveNullAndEmptyArrays": True 
-             }},
-             {"$project": { 
-                 "_id": 1, "request_type": 1, "status": 1, "created_at": 1, "updated_at": 1,
-                 "requester_id": 1, "target_id": 1, 
-                 "requester_info": { 
-                     "id": "$requester_info_doc._id", 
-                     "username": "$requester_info_doc.username",
-                     "email": "$requester_info_doc.email",
-                     "role": "$requester_info_doc.role", 
-                     "created_at": "$requester_info_doc.created_at", 
-                     "hr_status": "$requester_info_doc.hr_status", 
-                     "years_of_experience": "$requester_info_doc.years_of_experience", 
-                     "company": "$requester_info_doc.company", 
-                     "resume_path": "$requester_info_doc.resume_path", 
-                     "admin_manager_id": "$requester_info_doc.admin_manager_id"
-                 }
-             }}
-         ]
-         apps = await self.request_collection.aggregate(pipeline).to_list(length=None)
-         return apps
-
-
-    async def get_pending_requests_for_hr(self, hr_id_str: str) -> List[Dict[str, Any]]: # Changed type hint
+             },
+             projection=_PENDING_ITEM_PROJECTION
+         ).sort("created_at", 1)
+         async for app in self._stream_with_requester_info(cursor, _ADMIN_APP_REQUESTER_PROJECTION):
+             yield app
+
+
+    async def get_pending_requests_for_hr(self, hr_id_str: str) -> AsyncIterator[Dict[str, Any]]:
          logger.debug(f"Fetching pending requests for HR {hr_id_str}")
          hr_oid = ObjectId(hr_id_str)
-         pipeline = [
-             {"$match": {
+         cursor = self.request_collection.find(
+             {
                  "target_id": hr_oid,
                  "request_type": "request",
                  "status": "pending"
-             }},
-              {"$sort": {"created_at": 1}},
-             {"$lookup": { 
-                 "from": settings.MONGODB_COLLECTION_USERS,
-                 "localField": "requester_id",
-                 "foreignField": "_id",
-                 "as": "requester_info_doc"
-             }},
-             {"$unwind": { "path": "$requester_info_doc", "preserveNullAndEmptyArrays": True }},
-             {"$project": { 
-                 "_id": 1, "request_type": 1, "status": 1, "created_at": 1, "updated_at": 1,
-                 "requester_id": 1, "target_id": 1,
-                 "requester_info": {
-                     "id": "$requester_info_doc._id", 
-                     "username": "$requester_info_doc.username",
-                     "email": "$requester_info_doc.email",
-                     "role": "$requester_info_doc.role",
-                     "created_at": "$requester_info_doc.created_at" 
-                 }
-             }}
-         ]
-         reqs = await self.request_collection.aggregate(pipeline).to_list(length=None)
-         return reqs
+             },
+             projection=_PENDING_ITEM_PROJECTION
+         ).sort("created_at", 1)
+         async for req in self._stream_with_requester_info(cursor, _HR_REQ_REQUESTER_PROJECTION):
+             yield req
 
 
     async def hr_unmap(self, hr_user: User) -> bool:
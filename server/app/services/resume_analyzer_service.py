@@ -1,31 +1,46 @@
 # LLM_interviewer/server/app/services/resume_analyzer.py
 
+import hashlib
+import itertools
 import logging
 import re
+import sys
 from datetime import datetime, timezone
-from typing import List, Dict, Optional, Tuple, Any, Set
+from typing import Iterable, List, Dict, Optional, Tuple, Any, Set
 import asyncio
 
+from cachetools import TTLCache
+
+from app.core.config import settings
+
 logger = logging.getLogger(__name__) # Define logger at the top
 
-# --- NLP and Date Libraries ---
+# --- NLP Libraries ---
 # Added to requirements.txt:
 # spacy>=3.0.0,<4.0.0
-# python-dateutil>=2.8.0,<3.0.0
 # Download model: python -m spacy download en_core_web_lg (recommended)
+# Only doc.ents is read, so skip the components NER doesn't depend on (the parser dominates runtime)
+SPACY_DISABLED_PIPES = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer']
+
+SPACY_USING_GPU = False
+
 try:
     import spacy
     from spacy.matcher import Matcher
     NLP_LOADED = True
+    # Must run before spacy.load so the model is allocated on the GPU; prefer_gpu is a no-op without CUDA
+    if settings.RESUME_ANALYZER_USE_GPU:
+        SPACY_USING_GPU = spacy.prefer_gpu()
+        logger.info(f"spaCy GPU requested; using GPU: {SPACY_USING_GPU}")
     # Load the model once when the service is instantiated
     try:
         # Using a larger model generally yields better results for NER
-        NLP_MODEL = spacy.load('en_core_web_lg')
+        NLP_MODEL = spacy.load('en_core_web_lg', disable=SPACY_DISABLED_PIPES)
         logger.info("Successfully loaded spaCy model 'en_core_web_lg'.")
     except OSError:
         logger.warning("spaCy model 'en_core_web_lg' not found. Trying 'en_core_web_sm'.")
         try:
-            NLP_MODEL = spacy.load('en_core_web_sm')
+            NLP_MODEL = spacy.load('en_core_web_sm', disable=SPACY_DISABLED_PIPES)
             logger.info("Successfully loaded spaCy model 'en_core_web_sm'.")
         except OSError:
             logger.error("No spaCy models found (en_core_web_lg or en_core_web_sm). Download with: python -m spacy download [model_name]")
@@ -44,15 +59,12 @@ except ImportError:
     logger.warning("spaCy library not found. Install with 'pip install spacy' and download a model. Skill/Experience extraction will be limited.")
 
 try:
-    from dateutil.parser import parse as date_parse
-    # Use fuzzy parsing to handle slightly malformed dates
-    from dateutil.parser import ParserError as DateParserError
-    from dateutil.relativedelta import relativedelta
-    DATEUTIL_LOADED = True
+    import ahocorasick # pyahocorasick: multi-pattern matcher for single-pass skill keyword scanning
+    AHOCORASICK_LOADED = True
 except ImportError:
-    DATEUTIL_LOADED = False
-    DateParserError = Exception # Define fallback exception
-    logger.warning("python-dateutil library not found. Install with 'pip install python-dateutil'. Experience calculation will be limited.")
+    ahocorasick = None
+    AHOCORASICK_LOADED = False
+    logger.warning("pyahocorasick library not found. Install with 'pip install pyahocorasick'. Falling back to a token-span skill scan.")
 # --- End Libraries ---
 
 # --- Constants ---
@@ -75,10 +87,32 @@ SKILL_KEYWORDS = [
     "unit testing", "integration testing", "pytest", "junit", "selenium",
     "communication", "teamwork", "problem-solving", "leadership", # Soft skills
 ]
-SKILL_KEYWORDS_SET = set(s.lower() for s in SKILL_KEYWORDS)
+# Interned so membership hits on interned candidates (see extract_skills) resolve by identity, not char compare
+SKILL_KEYWORDS_SET = frozenset(sys.intern(s.lower()) for s in SKILL_KEYWORDS)
+
+def _build_skill_automaton():
+    """ Builds an Aho-Corasick automaton over all skill keywords, so one linear scan finds every skill. """
+    if not AHOCORASICK_LOADED:
+        return None
+    automaton = ahocorasick.Automaton()
+    for skill in SKILL_KEYWORDS_SET:
+        automaton.add_word(skill, skill)
+    automaton.make_automaton()
+    return automaton
+
+SKILL_AUTOMATON = _build_skill_automaton()
+
+# Token boundaries for keyword matching: whitespace, hyphens, slashes, brackets, quotes and , ; : ! ? separate
+# tokens, and a '.' only stays inside a token when more token characters follow ('react.js', 'asp.net', '.net' are
+# single tokens; the period in 'node.js.' is not). A skill only counts when it starts and ends on these boundaries.
+# spaCy's tokenizer is not used for this: it keeps e.g. 'AWS (EC2,S3)' partly glued together and would miss skills.
+_SKILL_TOKEN_CHARS = r'[^\s\-/()\[\]{}<>"\',;:!?.]'
+SKILL_TOKEN_REGEX = re.compile(r'(?:' + _SKILL_TOKEN_CHARS + r'|\.(?=' + _SKILL_TOKEN_CHARS + r'))+')
+# Longest skill in tokens, bounding the span lookups of the fallback scan
+SKILL_MAX_TOKENS = max(len(SKILL_TOKEN_REGEX.findall(skill)) for skill in SKILL_KEYWORDS_SET)
 
 # Regex for explicit YoE mentions
-YOE_REGEX = re.compile(r'(\d{1,2})\s*\+?\s+(?:year|yr)s?', re.IGNORECASE)
+YOE_REGEX = re.compile(r'(\d{1,2})\s*\+?\s+(?:year|yr)s?', re.IGNORECASE | re.ASCII)
 # Improved Regex for date ranges (still needs refinement for edge cases)
 # Handles YYYY, Mon YYYY, Month YYYY, MM/YYYY, MM-YYYY etc. Separators: -, –, to
 # End: YYYY, Mon YYYY, Month YYYY, MM/YYYY, MM-YYYY, Present, Current, Now, Today
@@ -102,15 +136,56 @@ DATE_RANGE_REGEX = re.compile(
         r'\s*(\d{4})'                            # Year (Capture Group 6)
         r'|(Present|Current|Today|Now)'          # OR Present/Current keyword (Capture Group 7)
     r')',
-    re.IGNORECASE
+    # ASCII: \d/\s/case folding skip Unicode tables; years/months must be ASCII digits for int() math anyway
+    re.IGNORECASE | re.ASCII
 )
+# Lowercase ORG/PRODUCT entity texts that are never skills; built once rather than per extract_skills call
+NON_SKILL_ENTITY_TERMS = frozenset({'inc', 'llc', 'ltd', 'corp', 'corporation', 'university', 'college', 'institute', 'company'})
+
+def normalize_skills(skills: Iterable[str]) -> List[str]:
+    """
+    Canonical form of a skill list: stripped, lowercased, deduplicated and sorted.
+    Stored 'extracted_skills_list' arrays are written in this form (resume upload is the only writer),
+    so search compares them as-is without per-query normalization.
+    """
+    return sorted({s.strip().lower() for s in skills if s and s.strip()})
+
+# analyze_resume results keyed by a digest of the resume text; re-uploads and re-scans of an unchanged
+# resume skip spaCy entirely. TTL bounds staleness of "Present" date ranges, which depend on today's date.
+_ANALYSIS_CACHE_TTL_SECONDS = 24 * 60 * 60
+_analysis_cache: TTLCache = TTLCache(maxsize=256, ttl=_ANALYSIS_CACHE_TTL_SECONDS)
+
+def _analysis_cache_key(resume_text: str) -> bytes:
+    return hashlib.blake2b(resume_text.encode('utf-8', errors='surrogatepass'), digest_size=16).digest()
+
+def _merged_month_span(intervals: List[Tuple[int, int]]) -> int:
+    """ Total months covered by inclusive (start, end) month-index intervals, counting overlaps once. Sorts in place. """
+    intervals.sort()
+    total_months = 0
+    merged_start, merged_end = intervals[0]
+    for start_month_idx, end_month_idx in intervals[1:]:
+        if start_month_idx <= merged_end + 1:
+            if end_month_idx > merged_end:
+                merged_end = end_month_idx
+        else:
+            total_months += merged_end - merged_start + 1
+            merged_start, merged_end = start_month_idx, end_month_idx
+    return total_months + merged_end - merged_start + 1
+
 MONTH_MAP = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6, 'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+# Every casing of each 3-letter month prefix ('Jan', 'JAN', 'jAn', ...) -> 0-based month, so the raw
+# regex capture (matched case-insensitively) can be looked up without slicing or lowercasing.
+MONTH_LUT = {
+    sys.intern(''.join(variant)): month - 1
+    for name, month in MONTH_MAP.items()
+    for variant in itertools.product(*((c, c.upper()) for c in name))
+}
 # --- End Constants ---
 
 
 class ResumeAnalyzerService:
     """
-    Service using spaCy and dateutil to extract skills and estimate experience.
+    Service using spaCy and regex date-range parsing to extract skills and estimate experience.
     """
 
     def __init__(self):
@@ -125,62 +200,85 @@ class ResumeAnalyzerService:
         else:
              logger.warning("ResumeAnalyzerService initialized WITHOUT spaCy resources.")
 
-    def _parse_date(self, month_str_name: Optional[str], month_str_num: Optional[str], year_str: Optional[str]) -> Optional[datetime]:
-        """ Safely parse year and optional month (name or number) into a datetime object. """
+    def _parse_date(self, month_str_name: Optional[str], month_str_num: Optional[str], year_str: Optional[str]) -> Optional[int]:
+        """ Parse year and optional month (name or number) into a month index: year * 12 + (month - 1). """
         if not year_str: return None
-        try:
-            year = int(year_str)
-            month = 1 # Default
-            if month_str_name:
-                month = MONTH_MAP.get(month_str_name[:3].lower(), 1)
-            elif month_str_num:
-                month_num = int(month_str_num)
-                if 1 <= month_num <= 12:
-                    month = month_num
-            # Use beginning of the month, timezone aware
-            return datetime(year, month, 1, tzinfo=timezone.utc)
-        except (ValueError, TypeError) as e:
-            logger.debug(f"Could not parse date components: MonthName='{month_str_name}', MonthNum='{month_str_num}', Year='{year_str}'. Error: {e}")
-            return None
+        # Groups come from DATE_RANGE_REGEX, so year/month numbers are always digit strings
+        month = 0 # Default: January
+        if month_str_name:
+            month = MONTH_LUT.get(month_str_name, 0)
+        elif month_str_num:
+            month_num = int(month_str_num)
+            if 1 <= month_num <= 12:
+                month = month_num - 1
+        return int(year_str) * 12 + month
 
     async def extract_skills(self, resume_text: str) -> List[str]:
+        """ Extracts skills off the event loop (keyword scan + spaCy NER are CPU-bound). """
+        return await asyncio.to_thread(self._extract_skills_sync, resume_text)
+
+    def _match_skill_keywords(self, resume_text: str) -> Set[str]:
+        """
+        Keyword matching over the raw lowercase text, with or without spaCy loaded.
+        Both backends keep a skill only when it spans whole SKILL_TOKEN_REGEX tokens, so they return the same set
+        (overlaps included, e.g. 'sql' and 'sql server').
+        """
+        extracted_skills: Set[str] = set()
+        text_lower = resume_text.lower()
+        token_spans = [match.span() for match in SKILL_TOKEN_REGEX.finditer(text_lower)]
+        if SKILL_AUTOMATON is not None:
+            # Single pass over the text; keep only hits that start and end on token boundaries
+            token_starts = {start for start, _ in token_spans}
+            token_ends = {end for _, end in token_spans}
+            for end_idx, skill in SKILL_AUTOMATON.iter(text_lower):
+                if skill not in extracted_skills and end_idx + 1 in token_ends and end_idx + 1 - len(skill) in token_starts:
+                    extracted_skills.add(skill)
+        else:
+            # Look up every run of up to SKILL_MAX_TOKENS consecutive tokens
+            for idx, (start, _) in enumerate(token_spans):
+                for _, end in token_spans[idx:idx + SKILL_MAX_TOKENS]:
+                    candidate = text_lower[start:end]
+                    if candidate in SKILL_KEYWORDS_SET:
+                        extracted_skills.add(sys.intern(candidate))
+        return extracted_skills
+
+    def _keywords_need_ner(self, keyword_skill_count: int) -> bool:
+        """ NER adds little once keyword matching alone has found enough skills, so it's skipped past the threshold. """
+        return settings.RESUME_FORCE_NER or keyword_skill_count < settings.RESUME_SKILL_FAST_PATH_THRESHOLD
+
+    def _extract_skills_sync(self, resume_text: str) -> List[str]:
         """ Extracts skills using keyword matching and basic spaCy NER. """
         if not resume_text: return []
         logger.debug("Extracting skills...")
-        extracted_skills: Set[str] = set() # Use a set for automatic deduplication
+        # 1. Keyword Matching - same token-boundary rule whether or not spaCy is loaded
+        extracted_skills: Set[str] = self._match_skill_keywords(resume_text) # Set for automatic deduplication
 
-        # 1. Keyword Matching (on lowercase text)
-        text_lower = resume_text.lower()
-        for skill in SKILL_KEYWORDS_SET:
-            # Use word boundaries for better accuracy
-            try:
-                if re.search(r'\b' + re.escape(skill) + r'\b', text_lower):
-                    extracted_skills.add(skill) # Add the canonical skill name
-            except re.error as re_err: # Catch potential regex errors with complex skills
-                 logger.warning(f"Regex error matching skill '{skill}': {re_err}")
-
-        # 2. spaCy Processing (if loaded)
+        # 2. spaCy NER (if loaded), unless keyword matching alone already found enough skills
         if self.nlp:
             try:
-                doc = self.nlp(resume_text)
-
-                # 2a. NER - Check ORG, PRODUCT, potentially others like NORP (Nationalities/Groups - sometimes tech groups)
-                # Filter common non-skill orgs/products if possible
-                common_non_skills = {'inc', 'llc', 'ltd', 'corp', 'corporation', 'university', 'college', 'institute', 'company'}
-                for ent in doc.ents:
-                    if ent.label_ in ["ORG", "PRODUCT"]: # Add other relevant labels if needed
-                        ent_text_lower = ent.text.lower().strip()
-                        # Check if it's a known skill or a plausible multi-word skill not in common non-skills
-                        if ent_text_lower in SKILL_KEYWORDS_SET or \
-                           (len(ent_text_lower) > 1 and ' ' in ent_text_lower and ent_text_lower not in common_non_skills):
-                             extracted_skills.add(ent_text_lower)
-
-                # 2b. spaCy Matcher (if patterns were added in __init__)
-                # matches = self.matcher(doc)
-                # for match_id, start, end in matches:
-                #    span = doc[start:end]
-                #    skill_name = self.nlp.vocab.strings[match_id] # Get the label used in matcher.add
-                #    extracted_skills.add(skill_name) # Add the canonical name from matcher
+                if self._keywords_need_ner(len(extracted_skills)):
+                    doc = self.nlp(resume_text)
+
+                    # 2a. NER - Check ORG, PRODUCT, potentially others like NORP (Nationalities/Groups - sometimes tech groups)
+                    # Filter common non-skill orgs/products if possible (NON_SKILL_ENTITY_TERMS)
+                    for ent in doc.ents:
+                        if ent.label_ in ["ORG", "PRODUCT"]: # Add other relevant labels if needed
+                            # Strip first: lowercases fewer characters. Interned so a hit against SKILL_KEYWORDS_SET
+                            # compares by identity, and repeated entities share one string in extracted_skills.
+                            ent_text_lower = sys.intern(ent.text.strip().lower())
+                            # Check if it's a known skill or a plausible multi-word skill not in common non-skills
+                            if ent_text_lower in SKILL_KEYWORDS_SET or \
+                               (len(ent_text_lower) > 1 and ' ' in ent_text_lower and ent_text_lower not in NON_SKILL_ENTITY_TERMS):
+                                 extracted_skills.add(ent_text_lower)
+
+                    # 2b. spaCy Matcher (if patterns were added in __init__)
+                    # matches = self.matcher(doc)
+                    # for match_id, start, end in matches:
+                    #    span = doc[start:end]
+                    #    skill_name = self.nlp.vocab.strings[match_id] # Get the label used in matcher.add
+                    #    extracted_skills.add(skill_name) # Add the canonical name from matcher
+                else:
+                    logger.debug(f"Keyword fast path: {len(extracted_skills)} skills found, skipping NER.")
 
             except Exception as e:
                 logger.error(f"Error during spaCy processing for skills: {e}", exc_info=True)
@@ -192,69 +290,56 @@ class ResumeAnalyzerService:
 
 
     async def extract_experience_years(self, resume_text: str) -> Optional[float]:
+        """ Estimates years of experience off the event loop (regex/date work is CPU-bound). """
+        return await asyncio.to_thread(self._extract_experience_years_sync, resume_text)
+
+    def _extract_experience_years_sync(self, resume_text: str) -> Optional[float]:
         """ Estimates total years of experience from date ranges and explicit mentions. """
-        if not resume_text or not DATEUTIL_LOADED:
+        if not resume_text:
             return None
 
         logger.debug("Extracting experience years...")
-        total_months = 0
-        max_explicit_yoe = 0.0
-        processed_text_segments = set() # To avoid double counting from identical text matches
 
-        # 1. Extract explicit mentions
-        try:
-            explicit_matches = YOE_REGEX.findall(resume_text)
-            if explicit_matches:
-                max_explicit_yoe = max(float(y) for y in explicit_matches)
-                logger.debug(f"Found max explicit YoE mention: {max_explicit_yoe}")
-        except Exception as e:
-            logger.warning(f"Error parsing explicit YoE mentions: {e}")
+        # 1. Extract explicit mentions (the capture is always 1-2 ASCII digits); float so estimated_yoe stays a float
+        max_explicit_yoe = max(map(float, YOE_REGEX.findall(resume_text)), default=0.0)
+        if max_explicit_yoe:
+            logger.debug(f"Found max explicit YoE mention: {max_explicit_yoe}")
 
         # 2. Extract from date ranges
         now = datetime.now(timezone.utc)
-        durations_months = []
+        now_month_idx = now.year * 12 + now.month - 1 # Resolves "Present"/"Current" ends
+        intervals: List[Tuple[int, int]] = [] # Inclusive (start_month_idx, end_month_idx) pairs
 
         for match in DATE_RANGE_REGEX.finditer(resume_text):
-            full_match_text = match.group(0)
-            if full_match_text in processed_text_segments:
-                continue # Skip if we already processed this exact string match
-            processed_text_segments.add(full_match_text)
-
+            # Repeated identical ranges need no special casing: they collapse in the interval merge below
             # Extract captured groups carefully based on the regex structure
             start_month_name, start_month_num, start_year, \
             end_month_name, end_month_num, end_year, present_keyword = match.groups()
 
-            start_date = self._parse_date(start_month_name, start_month_num, start_year)
-            end_date = None
-
+            start_month_idx = self._parse_date(start_month_name, start_month_num, start_year)
             if present_keyword:
-                end_date = now
+                end_month_idx = now_month_idx
             else:
-                end_date = self._parse_date(end_month_name, end_month_num, end_year)
-
-            if start_date and end_date and end_date >= start_date:
-                try:
-                    delta = relativedelta(end_date, start_date)
-                    # Add 1 month because range "Jan 2023 - Jan 2023" should be 1 month, not 0
-                    duration_months = (delta.years * 12 + delta.months) + 1
-                    durations_months.append(duration_months)
-                    logger.debug(f"Parsed range: '{full_match_text}' -> Start: {start_date.date()}, End: {end_date.date()}, Duration: {duration_months} months")
-                except Exception as e:
-                    logger.warning(f"Error calculating duration for range '{full_match_text}': {e}")
-            elif start_date:
-                 logger.debug(f"Parsed range '{full_match_text}' but end date was invalid or before start date.")
-
-
-        # 3. Aggregate Durations (Simplified - Summing durations, doesn't handle overlaps perfectly)
-        # A better approach would identify job blocks and build a non-overlapping timeline.
-        if durations_months:
-            total_months = sum(durations_months)
+                end_month_idx = self._parse_date(end_month_name, end_month_num, end_year)
+
+            if start_month_idx is not None and end_month_idx is not None and end_month_idx >= start_month_idx:
+                # Add 1 month because range "Jan 2023 - Jan 2023" should be 1 month, not 0
+                duration_months = end_month_idx - start_month_idx + 1
+                intervals.append((start_month_idx, end_month_idx))
+                logger.debug(f"Parsed range: '{match.group(0)}' -> Duration: {duration_months} months")
+            elif start_month_idx is not None:
+                 logger.debug(f"Parsed range '{match.group(0)}' but end date was invalid or before start date.")
+
+
+        # 3. Aggregate Durations - merge overlapping/adjacent ranges so concurrent roles aren't double counted
+        if intervals:
+            total_months = _merged_month_span(intervals)
             calculated_yoe = total_months / 12.0
-            logger.debug(f"Total calculated YoE from date ranges (summed, may overlap): {calculated_yoe:.2f}")
+            logger.debug(f"Total calculated YoE from date ranges (merged timeline): {calculated_yoe:.2f}")
         else:
             calculated_yoe = 0.0
 
-        # 4. Determine final YoE
+        # 4. Determine final YoE (explicit "N years" mentions act as a floor)
         final_yoe = max(max_explicit_yoe, calculated_yoe)
 
         logger.info(f"Estimated experience years: {final_yoe:.2f}")
@@ -267,25 +352,27 @@ class ResumeAnalyzerService:
         if not resume_text:
              return {"extracted_skills_list": [], "estimated_yoe": None} # Match expected keys
 
+        cache_key = _analysis_cache_key(resume_text)
+        cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Resume analysis served from cache.")
+            # Copy so callers can't mutate the cached entry
+            return {**cached, "extracted_skills_list": list(cached["extracted_skills_list"])}
+
         logger.info("Performing comprehensive resume analysis...")
-        # Run extractions
-        # Using asyncio.gather can speed things up if functions are truly async or CPU-bound enough
-        # results = await asyncio.gather(
-        #     self.extract_skills(resume_text),
-        #     self.extract_experience_years(resume_text)
-        # )
-        # skills = results[0]
-        # experience_years = results[1]
-
-        # Run sequentially for simplicity
-        skills = await self.extract_skills(resume_text)
-        experience_years = await self.extract_experience_years(resume_text)
+        # Run both extractions in worker threads so the event loop stays responsive. Both are CPU-bound Python
+        # (spaCy's small CPU pipeline mostly holds the GIL), so this is for responsiveness, not a parallel speedup.
+        skills, experience_years = await asyncio.gather(
+            asyncio.to_thread(self._extract_skills_sync, resume_text),
+            asyncio.to_thread(self._extract_experience_years_sync, resume_text),
+        )
 
         analysis_result = {
             "extracted_skills_list": skills,
             "estimated_yoe": experience_years,
             # Add other extracted fields here if implemented
         }
+        _analysis_cache[cache_key] = {**analysis_result, "extracted_skills_list": list(skills)}
         logger.info("Resume analysis complete.")
         return analysis_result
 
@@ -1,23 +1,137 @@
 # LLM_interviewer/server/app/services/resume_parser.py
 
+import asyncio
+import hashlib
+import io
 import logging
+import zipfile
 from pathlib import Path
-from typing import Optional
+from typing import List, Tuple
+from xml.etree import ElementTree
 
-import aiofiles
+from cachetools import LRUCache
 from pypdf import PdfReader
-from docx import Document
 
 logger = logging.getLogger(__name__)
 
+try:
+    import fitz # Optional PyMuPDF (AGPL, not in requirements.txt): MuPDF's C text extraction, far faster than pypdf
+    FITZ_LOADED = True
+except ImportError:
+    fitz = None
+    FITZ_LOADED = False
+    logger.info("PyMuPDF not installed; using pypdf for PDF text extraction.")
+
 class ResumeParserError(Exception):
     """Custom exception for resume parsing errors."""
     pass
 
+def _extract_pdf_text_fitz(pdf_bytes: bytes) -> str:
+    """ Extracts text for all pages with PyMuPDF; get_text runs entirely in native code. """
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return "\n".join(page.get_text("text") for page in doc).strip()
+
+def _parse_pdf_sync(pdf_bytes: bytes, file_path: Path) -> str:
+    """ Extracts text from PDF bytes with PyMuPDF or pypdf, falling back to a plain-text decode. Runs in a worker thread. """
+    content = ""
+    if FITZ_LOADED:
+        try:
+            content = _extract_pdf_text_fitz(pdf_bytes)
+            if content:
+                logger.info(f"Successfully parsed PDF with PyMuPDF: {file_path}, extracted {len(content)} characters.")
+                return content
+            logger.warning(f"PyMuPDF extracted no content from PDF: {file_path}. Trying pypdf.")
+        except Exception as fitz_error:
+            logger.warning(f"PyMuPDF failed to process PDF {file_path}: {fitz_error}. Trying pypdf.")
+
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        content_parts = [text for page in reader.pages if (text := page.extract_text())] # extract_text once per page
+        content = "\n".join(content_parts).strip()
+        if content:
+            logger.info(f"Successfully parsed PDF with pypdf: {file_path}, extracted {len(content)} characters.")
+            return content
+        else: # pypdf succeeded but extracted no content
+            logger.warning(f"pypdf extracted no content from PDF (reader succeeded but no text): {file_path}.")
+    except Exception as pypdf_error: # Includes PdfStreamError and other pypdf issues
+        logger.warning(f"pypdf failed to process PDF {file_path}: {pypdf_error}. Attempting plain text read as fallback.")
+
+    # Fallback to plain text if pypdf failed or yielded no content
+    logger.debug(f"PDF Fallback: pdf_bytes (first 100): {pdf_bytes[:100]}")
+    try:
+        decoded_text = pdf_bytes.decode('utf-8', errors='ignore')
+        logger.debug(f"PDF Fallback: decoded_text (before strip): '{decoded_text}'")
+        decoded_text_stripped = decoded_text.strip()
+        logger.debug(f"PDF Fallback: decoded_text_stripped: '{decoded_text_stripped}'")
+        if decoded_text_stripped:
+            logger.info(f"Successfully read PDF as plain text (fallback): {file_path}, {len(decoded_text_stripped)} chars.")
+            return decoded_text_stripped
+        else:
+            logger.warning(f"Plain text fallback also yielded no content for PDF: {file_path} (decoded_text_stripped was empty)")
+            return "" # Return empty string if fallback is also empty
+    except Exception as text_e:
+        logger.error(f"Error during plain text fallback for PDF {file_path}: {text_e}", exc_info=True)
+        return "" # Return empty string on fallback error
+
+# Parsed text keyed by (extension, size, content digest): re-uploads and re-analyses of the same file skip parsing.
+# Only touched from parse_resume on the event loop, so no lock is needed.
+_parsed_text_cache: LRUCache = LRUCache(maxsize=256)
+
+def _read_file_with_digest(file_path: Path) -> Tuple[bytes, bytes]:
+    """ Reads the file and hashes it in one worker-thread hop (hashing a multi-MB PDF shouldn't block the loop). """
+    file_bytes = file_path.read_bytes()
+    return file_bytes, hashlib.blake2b(file_bytes, digest_size=16).digest()
+
+# WordprocessingML tags read from word/document.xml (ElementTree qualifies tags as {namespace}local)
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_PARAGRAPH = f"{_W_NS}p"
+_W_TEXT = f"{_W_NS}t"
+_W_TAB = f"{_W_NS}tab"
+_W_BREAKS = (f"{_W_NS}br", f"{_W_NS}cr")
+
+def _parse_docx_sync(doc_bytes: bytes, file_path: Path) -> str:
+    """
+    Extracts paragraph text from DOCX bytes by streaming word/document.xml out of the zip.
+    Avoids building a full python-docx object tree just to read text. Runs in a worker thread.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(doc_bytes)) as docx_zip:
+            document_xml = docx_zip.read("word/document.xml")
+
+        text_parts: List[str] = []
+        para_chunks: List[str] = []
+        # 'end' events close inner elements first, so nested paragraphs (e.g. text boxes) flush on their own
+        for _, elem in ElementTree.iterparse(io.BytesIO(document_xml), events=("end",)):
+            tag = elem.tag
+            if tag == _W_TEXT:
+                if elem.text:
+                    para_chunks.append(elem.text)
+            elif tag == _W_TAB:
+                para_chunks.append("\t")
+            elif tag in _W_BREAKS:
+                para_chunks.append("\n")
+            elif tag == _W_PARAGRAPH:
+                if para_chunks:
+                    text_parts.append("".join(para_chunks))
+                    para_chunks = []
+                elem.clear() # Free the finished paragraph's subtree
+        content = "\n".join(text_parts)
+        if not content.strip():
+            logger.warning(f"Extracted empty content from DOCX: {file_path}")
+        logger.info(f"Successfully parsed DOCX: {file_path}, extracted {len(content)} characters.")
+        return content
+    except Exception as e: # zipfile.BadZipFile, KeyError (no document.xml), ElementTree.ParseError
+        logger.error(f"Error parsing DOCX file {file_path}: {e}", exc_info=True)
+        raise ResumeParserError(f"Failed to parse DOCX file: {e}")
+
 async def parse_resume(file_path: Path) -> str:
     """
     Parses the content of a resume file (PDF or DOCX) and returns the extracted text.
 
+    Both the file read and the (synchronous, CPU-bound) pypdf/DOCX XML parsing run in
+    worker threads so the event loop isn't blocked on large or multi-page files. Results are
+    cached by file content, so an unchanged file is only parsed once per process.
+
     Args:
         file_path: Path object pointing to the resume file.
 
@@ -32,66 +146,23 @@ async def parse_resume(file_path: Path) -> str:
 
     try:
         if file_extension == ".pdf":
-            # pypdf is synchronous, so read file async then parse
-            async with aiofiles.open(file_path, "rb") as f:
-                pdf_bytes = await f.read()
-            import io # Required for BytesIO
-            content = ""
-            try:
-                reader = PdfReader(io.BytesIO(pdf_bytes))
-                content_parts = [page.extract_text() for page in reader.pages if page.extract_text()]
-                content = "\n".join(content_parts).strip()
-                if content:
-                    logger.info(f"Successfully parsed PDF with pypdf: {file_path}, extracted {len(content)} characters.")
-                    return content
-                else: # pypdf succeeded but extracted no content
-                    logger.warning(f"pypdf extracted no content from PDF (reader succeeded but no text): {file_path}.")
-            except Exception as pypdf_error: # Includes PdfStreamError and other pypdf issues
-                logger.warning(f"pypdf failed to process PDF {file_path}: {pypdf_error}. Attempting plain text read as fallback.")
-
-            # Fallback to plain text if pypdf failed or yielded no content
-            logger.debug(f"PDF Fallback: pdf_bytes (first 100): {pdf_bytes[:100]}")
-            try:
-                decoded_text = pdf_bytes.decode('utf-8', errors='ignore')
-                logger.debug(f"PDF Fallback: decoded_text (before strip): '{decoded_text}'")
-                decoded_text_stripped = decoded_text.strip()
-                logger.debug(f"PDF Fallback: decoded_text_stripped: '{decoded_text_stripped}'")
-                if decoded_text_stripped:
-                    logger.info(f"Successfully read PDF as plain text (fallback): {file_path}, {len(decoded_text_stripped)} chars.")
-                    return decoded_text_stripped
-                else:
-                    logger.warning(f"Plain text fallback also yielded no content for PDF: {file_path} (decoded_text_stripped was empty)")
-                    return "" # Return empty string if fallback is also empty
-            except Exception as text_e:
-                logger.error(f"Error during plain text fallback for PDF {file_path}: {text_e}", exc_info=True)
-                return "" # Return empty string on fallback error
+            parse_sync = _parse_pdf_sync
         elif file_extension == ".docx":
-            # python-docx is synchronous
-            # It can take a file path directly.
-            # To keep the function async and avoid blocking for large files,
-            # one might consider running this in a thread pool executor,
-            # but for typical resume sizes, direct call might be acceptable.
-            # For simplicity here, direct call. If blocking becomes an issue, refactor.
-            try:
-                # python-docx Document() can take a path string or a file-like object.
-                # Reading with aiofiles first to maintain async pattern, though Document itself is sync.
-                async with aiofiles.open(file_path, "rb") as f:
-                    doc_bytes = await f.read()
-                
-                import io # Required for BytesIO
-                doc = Document(io.BytesIO(doc_bytes))
-                text_parts = [para.text for para in doc.paragraphs if para.text]
-                content = "\n".join(text_parts)
-                if not content.strip():
-                    logger.warning(f"Extracted empty content from DOCX: {file_path}")
-                logger.info(f"Successfully parsed DOCX: {file_path}, extracted {len(content)} characters.")
-                return content
-            except Exception as e: # Catch specific docx errors if known, e.g., PackageNotFoundError
-                logger.error(f"Error parsing DOCX file {file_path} with python-docx: {e}", exc_info=True)
-                raise ResumeParserError(f"Failed to parse DOCX file: {e}")
+            parse_sync = _parse_docx_sync
         else:
             logger.error(f"Unsupported file type: {file_extension} for file {file_path}")
             raise ResumeParserError(f"Unsupported file type: {file_extension}")
+
+        file_bytes, digest = await asyncio.to_thread(_read_file_with_digest, file_path) # Single thread-pool hop for the whole file
+        cache_key = (file_extension, len(file_bytes), digest)
+        cached_content = _parsed_text_cache.get(cache_key)
+        if cached_content is not None:
+            logger.info(f"Parsed resume text served from cache: {file_path}, {len(cached_content)} characters.")
+            return cached_content
+
+        content = await asyncio.to_thread(parse_sync, file_bytes, file_path)
+        _parsed_text_cache[cache_key] = content
+        return content
     except ResumeParserError: # Re-raise specific errors
         raise
     except Exception as e:
@@ -1,27 +1,81 @@
 # LLM_interviewer/server/app/services/search_service.py
 
+import itertools
 import logging
-from typing import List, Dict, Optional, Any, Literal
-from bson import ObjectId
-from pydantic import BaseModel, Field, ConfigDict
-from motor.motor_asyncio import AsyncIOMotorClient
-from fastapi import HTTPException, status
+import re
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Tuple
+from pydantic import TypeAdapter, ValidationError
+from pymongo.asynchronous.database import AsyncDatabase
+from fastapi import HTTPException
 
 from app.db.mongodb import mongodb
 from app.core.config import settings
-from app.models.user import User, CandidateMappingStatus, HrStatus
-
-# ResumeAnalyzerService might not be directly needed if data is stored,
-# but keep import for potential future re-analysis features.
-from .resume_analyzer_service import ResumeAnalyzerService
+from app.models.user import HrStatus
 
 # Import centralized search schemas
 from app.schemas.search import RankedHR, RankedCandidate # Import both
-# For RankedCandidate, CandidateProfileOut is already a base for it in schemas.search
-# from app.schemas.user import CandidateProfileOut # No longer needed here directly for RankedCandidate
 
 logger = logging.getLogger(__name__)
 
+# Built once: validating a whole result list through one adapter is a single schema dispatch instead of one per document
+_RANKED_CANDIDATES_ADAPTER = TypeAdapter(List[RankedCandidate])
+_RANKED_HRS_ADAPTER = TypeAdapter(List[RankedHR])
+
+
+# Phrase tokens: lowercase alphanumeric runs, keeping '+'/'#' so "c++" and "c#" survive
+_PHRASE_TOKEN_REGEX = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_PHRASE_STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "i", "in", "is", "it",
+    "my", "of", "on", "or", "our", "the", "to", "was", "were", "will", "with",
+})
+
+
+def _phrase_tokens(text: str) -> List[str]:
+    return [token for token in _PHRASE_TOKEN_REGEX.findall(text.lower()) if token not in _PHRASE_STOP_WORDS]
+
+
+def extract_resume_phrases(resume_text: str) -> List[str]:
+    """
+    Distinct 2..SEARCH_PHRASE_MAX_WORDS-word phrases of the resume (lowercased, stop words removed),
+    stored as 'resume_phrases' so phrase keywords are a multikey index equality seek instead of $text.
+    Shorter phrases come first and the list is capped at SEARCH_PHRASE_MAX_PHRASES.
+    """
+    tokens = _phrase_tokens(resume_text)
+    phrases = dict.fromkeys( # Ordered dedupe
+        " ".join(tokens[start:start + size])
+        for size in range(2, settings.SEARCH_PHRASE_MAX_WORDS + 1)
+        for start in range(len(tokens) - size + 1)
+    )
+    return list(itertools.islice(phrases, settings.SEARCH_PHRASE_MAX_PHRASES))
+
+
+def keyword_to_phrase(keyword: str) -> Optional[str]:
+    """ A search keyword in resume_phrases form, or None if it can't match a stored phrase (under 2 / too many words). """
+    tokens = _phrase_tokens(keyword)
+    if not 2 <= len(tokens) <= settings.SEARCH_PHRASE_MAX_WORDS:
+        return None
+    return " ".join(tokens)
+
+
+def _validate_ranked(adapter: TypeAdapter, entries: List[Dict[str, Any]], kind: str) -> list:
+    """
+    Validates pre-shaped result dicts in one batch. Invalid entries are dropped rather than failing the
+    search: their list positions come from the batch error, the rest are re-validated in one more batch,
+    and all failures are reported in a single warning.
+    """
+    try:
+        return adapter.validate_python(entries)
+    except ValidationError as e:
+        errors: Dict[int, List[str]] = {}
+        for error in e.errors(include_url=False):
+            errors.setdefault(error["loc"][0], []).append(f"{'.'.join(map(str, error['loc'][1:]))}: {error['msg']}")
+        logger.warning(
+            "%d %s validation failure(s); dropped from results: %s",
+            len(errors), kind, {entries[index].get("id"): messages for index, messages in errors.items()},
+        )
+        return adapter.validate_python([entry for index, entry in enumerate(entries) if index not in errors])
+
 # InternalRankedCandidate is no longer needed as we will use RankedCandidate from app.schemas.search
 
 class SearchService:
@@ -29,10 +83,41 @@ class SearchService:
     Service for searching and ranking Users (Candidates, HRs).
     Assumes resume analysis results (skills, YoE) are stored on the User document
     (e.g., as 'extracted_skills_list' and 'estimated_yoe').
-    Requires a text index on 'resume_text' for keyword search.
+    Keyword search requires the 'resume_text' text index (see MongoDB.ensure_indexes) and SEARCH_TEXT_ENABLED,
+    or the resume_phrases index when SEARCH_PHRASE_INDEX_ENABLED is set.
     """
 
-    def __init__(self, db: Optional[AsyncIOMotorClient] = None):
+    # --- Relevance weighting (Tune these values) ---
+    _WEIGHT_TECH = 0.70  # Weight for skill match component
+    _WEIGHT_MONGO = 0.30  # Weight for MongoDB text search relevance score
+
+    # Inclusion projections: only the fields ranking and the response schemas read.
+    # resume_text (often tens of KB per user) is deliberately left out.
+    _HR_PROJ: Dict[str, Any] = {
+        "_id": 1, "username": 1, "email": 1, "role": 1, "created_at": 1, "resume_path": 1,
+        "hr_status": 1, "years_of_experience": 1, "company": 1, "admin_manager_id": 1,
+    }
+    # Final stage of the candidate pipeline: emits documents already in RankedCandidate's shape
+    # (string ids, defaults applied, scores nested under match_details), so they need no reshaping in Python.
+    # They are still validated: the profile fields come from stored user documents.
+    _CAND_RANKED_PROJ: Dict[str, Any] = {
+        "_id": 0,
+        "id": {"$toString": "$_id"},
+        "username": 1, "email": 1, "role": 1, "created_at": 1, "resume_path": 1, "mapping_status": 1,
+        "extracted_skills_list": {"$ifNull": ["$extracted_skills_list", []]},
+        "estimated_yoe": {"$ifNull": ["$estimated_yoe", 0.0]},
+        "assigned_hr_id": {"$toString": "$assigned_hr_id"},  # null stays null
+        "relevance_score": 1,
+        "match_details": {
+            "mongo_text_score": "$mongo_score",
+            "tech_match_score": "$tech_match",
+            "matched_skill_count": "$matched_skill_count",
+        },
+    }
+    # HR projection plus the $text relevance score, for keyword searches
+    _HR_TEXT_PROJ: Dict[str, Any] = {**_HR_PROJ, "mongo_score": {"$meta": "textScore"}}
+
+    def __init__(self, db: Optional[AsyncDatabase] = None):
         self.db = db if db is not None else mongodb.get_db()
         if self.db is None:
             raise RuntimeError("Database not available in SearchService.")
@@ -40,161 +125,158 @@ class SearchService:
         # Analyzer instance isn't strictly needed here if we assume data is pre-stored
         # self.analyzer = analyzer if analyzer else resume_analyzer_service
 
-    def _get_stored_analysis_data(self, user_doc: Dict[str, Any]) -> Dict[str, Any]:
-        """Helper to safely get pre-stored analysis data from user document."""
-        # Adjust field names to match EXACTLY how they are stored in MongoDB
-        # These names MUST match the keys used in the update_doc within the
-        # upload_resume functions in candidates.py and hr.py routes.
-        return {
-            "extracted_skills": user_doc.get(
-                "extracted_skills_list", []
-            ),  # Assumed stored field name
-            "estimated_experience_years": user_doc.get("estimated_yoe", 0.0)
-            or 0.0,  # Assumed stored field name
-        }
-
-    def _calculate_tech_match(
-        self, candidate_skills: List[str], required_skills: List[str]
-    ) -> float:
-        """Calculates Jaccard Index for skill matching."""
-        if not required_skills:
-            return 1.0  # No required skills means perfect match? Or 0.0? Define requirement. Assume 1.0 for now.
-        if not candidate_skills:
-            return 0.0
-
-        # Ensure comparison is case-insensitive and ignores leading/trailing spaces
-        set_candidate = set(s.lower().strip() for s in candidate_skills if s)
-        set_required = set(s.lower().strip() for s in required_skills if s)
-
-        intersection = len(set_candidate.intersection(set_required))
-        union = len(set_candidate.union(set_required))
-        return float(intersection / union) if union > 0 else 0.0
-
-    def _calculate_ranking_score(
-        self,
-        user_doc: Dict[str, Any],  # Raw doc from DB
-        extracted_data: Dict[str, Any],  # Data from _get_stored_analysis_data
-        search_skills: Optional[List[str]] = None,
-        mongo_text_score: float = 0.0,
-    ) -> float:
-        """Calculates ranking score: (WEIGHT_TECH * tech_match) * YoE_Multiplier + (WEIGHT_MONGO * mongo_text_score)"""
-        # --- Constants for Weighting (Tune these values) ---
-        WEIGHT_TECH = 0.70  # Weight for skill match component
-        WEIGHT_MONGO = 0.30  # Weight for MongoDB text search relevance score
-        # ---
-
-        extracted_skills = extracted_data.get("extracted_skills", [])
-        yoe = extracted_data.get("estimated_experience_years", 0.0)
-
-        # Calculate Tech Match Score
-        tech_match_score = 1.0  # Default if no skills specified in search
-        if search_skills:
-            # Use the internal helper method
-            tech_match_score = self._calculate_tech_match(
-                extracted_skills, search_skills
-            )
-
-        # Calculate Experience Multiplier (YoE=0 treated as 1x multiplier)
-        experience_multiplier = max(1.0, yoe)
-
-        # Calculate base score from tech match and experience
-        base_score = tech_match_score * experience_multiplier
-
-        # Combine with MongoDB text score (if available) using weights
-        combined_score = (WEIGHT_TECH * base_score) + (WEIGHT_MONGO * mongo_text_score)
-
-        return round(combined_score, 4)
+    def _build_candidate_ranking_stages(
+        self, required_skills_lower: Optional[List[str]], use_text_score: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregation stages that score candidates server-side:
+        relevance_score = (_WEIGHT_TECH * tech_match * max(1, estimated_yoe)) + (_WEIGHT_MONGO * textScore)
+        where tech_match is the Jaccard index between the stored and required skill sets.
+        """
+        mongo_score: Any = {"$meta": "textScore"} if use_text_score else 0.0
+        # YoE=0 (or missing) is treated as a 1x multiplier
+        experience_multiplier = {"$max": [1.0, {"$ifNull": ["$estimated_yoe", 0.0]}]}
+
+        if required_skills_lower:
+            # Jaccard with MongoDB's set operators; the skill arrays never leave the server for scoring
+            candidate_skills = {"$ifNull": ["$extracted_skills_list", []]}
+            scoring_stages: List[Dict[str, Any]] = [
+                {
+                    "$addFields": {
+                        "mongo_score": mongo_score,
+                        "matched_skill_count": {"$size": {"$setIntersection": [candidate_skills, required_skills_lower]}},
+                        "_skill_union_size": {"$size": {"$setUnion": [candidate_skills, required_skills_lower]}},
+                    }
+                },
+                {
+                    "$addFields": {
+                        "tech_match": {
+                            "$cond": [
+                                {"$gt": ["$_skill_union_size", 0]},
+                                {"$divide": ["$matched_skill_count", "$_skill_union_size"]},
+                                0.0,
+                            ]
+                        }
+                    }
+                },
+            ]
+        else:
+            # No skills specified in search
+            scoring_stages = [{"$addFields": {"mongo_score": mongo_score, "tech_match": 1.0}}]
+
+        return [
+            *scoring_stages,
+            {
+                "$addFields": {
+                    "relevance_score": {
+                        "$round": [
+                            {
+                                "$add": [
+                                    {"$multiply": [self._WEIGHT_TECH, "$tech_match", experience_multiplier]},
+                                    {"$multiply": [self._WEIGHT_MONGO, "$mongo_score"]},
+                                ]
+                            },
+                            4,
+                        ]
+                    }
+                }
+            },
+        ]
+
+    def _keyword_clause(self, keyword: str) -> Optional[Dict[str, Any]]:
+        """
+        Filter clause for a keyword: an equality seek on the indexed resume_phrases when the phrase index is
+        enabled and the keyword has a phrase form, otherwise $text over resume_text (only HRs/candidates with
+        parsed text). None when the keyword can't be searched (no usable text index).
+        """
+        if settings.SEARCH_PHRASE_INDEX_ENABLED:
+            phrase = keyword_to_phrase(keyword)
+            if phrase:
+                return {"resume_phrases": phrase}
+        if not mongodb.resume_text_search_enabled:
+            return None
+        # $gt "" only matches non-empty strings, so users without parsed text (field unset or null) are skipped
+        return {"$text": {"$search": keyword}, "resume_text": {"$gt": ""}}
+
+    def _candidate_top_k_stages(
+        self, required_skills_lower: Optional[List[str]], use_text_score: bool, limit: int
+    ) -> List[Dict[str, Any]]:
+        """ Stages following the candidate $match: score, sort, limit to the top-K and shape the output. """
+        ranking_stages = self._build_candidate_ranking_stages(required_skills_lower, use_text_score)
+        if required_skills_lower or use_text_score:
+            # Score depends on per-document skill overlap / text relevance, so every match is scored before top-K
+            return [
+                *ranking_stages,
+                {"$sort": {"relevance_score": -1, "updated_at": -1}},
+                {"$limit": limit},
+                {"$project": self._CAND_RANKED_PROJ},
+            ]
+        # Score is monotonic in estimated_yoe alone: $sort + $limit directly after $match picks the same top-K
+        # (index-backed via role/mapping_status/estimated_yoe), and score fields are computed only for survivors.
+        # Nothing may be inserted between $match and this $sort, or the planner can no longer use the index.
+        return [
+            {"$sort": {"estimated_yoe": -1, "updated_at": -1}},
+            {"$limit": limit},
+            *ranking_stages,
+            {"$project": self._CAND_RANKED_PROJ},
+        ]
 
     async def search_candidates(
         self,
         keyword: Optional[str] = None,
-        required_skills: Optional[List[str]] = None,
-        yoe_min: Optional[int] = None,
+        required_skills_lower: Optional[List[str]] = None,
+        yoe_min: Optional[float] = None,
         limit: int = 20,
     ) -> List[RankedCandidate]: # Use RankedCandidate from app.schemas.search
-        """Searches and ranks candidates (status 'pending_assignment')."""
+        """
+        Searches and ranks candidates (status 'pending_assignment').
+        `required_skills_lower` must already be in normalize_skills() form; callers normalize once at the route.
+        """
         logger.info(
-            f"Searching candidates. Keywords: {keyword}, Skills: {required_skills}, YoE Min: {yoe_min}"
+            f"Searching candidates. Keywords: {keyword}, Skills: {required_skills_lower}, YoE Min: {yoe_min}"
         )
 
+        # Keyword search needs the text index or the phrase index; without it, $text would fail on every call
+        keyword_clause = self._keyword_clause(keyword) if keyword else None
+        if keyword and keyword_clause is None:
+            logger.warning("Keyword candidate search requested but the keyword can't be searched. Returning no results.")
+            return []
+        use_text_score = keyword_clause is not None and "$text" in keyword_clause
+
         # --- 1. Build Query ---
-        query: Dict[str, Any] = {
-            "role": "candidate",
-            "mapping_status": "pending_assignment",
-            # Ensure required fields for ranking exist (assuming they are stored)
-            "estimated_yoe": {"$exists": True},  # Assumes 'estimated_yoe' field exists
-            "extracted_skills_list": {
-                "$exists": True
-            },  # Assumes 'extracted_skills_list' field exists
-            "resume_text": {"$ne": None},
-        }
-        projection: Optional[Dict[str, Any]] = None  # Initialize projection
-        sort_criteria: List[Tuple[str, Any]] = [("updated_at", -1)]  # Default sort
-
-        # Add keyword text search filter and projection/sort
-        if keyword:
-            query["$text"] = {"$search": keyword}
-            projection = {
-                "mongo_score": {"$meta": "textScore"}
-            }  # Project score as 'mongo_score'
-            sort_criteria = [
-                ("mongo_score", {"$meta": "textScore"})
-            ]  # Sort by relevance first
-            logger.debug("Added $text search to candidate query")
-
-        # Add YoE filter (uses stored 'estimated_yoe' field)
+        # One clause per active filter, combined once at the end (no re-nesting as filters intersect).
+        # No $exists/$ne-null checks: search fields are defaulted at registration and the
+        # ranking stages $ifNull any gaps, so the planner can stay on the role/status/YoE index.
+        clauses: List[Dict[str, Any]] = [{"role": "candidate", "mapping_status": "pending_assignment"}]
+        if keyword_clause:
+            clauses.append(keyword_clause)  # With $text, its textScore feeds the ranking pipeline
         if yoe_min is not None:
-            # Ensure query uses $and if keyword search is also present
-            if "$text" in query:
-                query = {"$and": [query, {"estimated_yoe": {"$gte": float(yoe_min)}}]}
-            else:
-                query["estimated_yoe"] = {"$gte": float(yoe_min)}
-            logger.debug(f"Added candidate YoE filter: >= {yoe_min}")
-
-        # Add skill filter (uses stored 'extracted_skills_list', assumes lowercase list)
-        if required_skills:
-            skills_lower = [skill.lower().strip() for skill in required_skills]
-            # Use $in to fetch candidates who have at least one of the required skills
-            # The ranking logic will then score based on the proportion of all required skills matched
-            skill_filter = {"extracted_skills_list": {"$in": skills_lower}}
-            if "$and" in query:
-                query["$and"].append(skill_filter)
-            elif "$text" in query:  # Need $and if text search and skills are present
-                query = {"$and": [query, skill_filter]}
-            else:
-                # If only skill filter is present, add it directly
-                query["extracted_skills_list"] = {"$in": skills_lower}
-            logger.debug(f"Added candidate skill filter (in): {skills_lower}")
-
-        # --- 2. Fetch Candidates ---
+            clauses.append({"estimated_yoe": {"$gte": float(yoe_min)}})
+        if required_skills_lower:
+            # $in fetches candidates with at least one required skill; ranking scores the overlap with all of them
+            # (stored 'extracted_skills_list' is already normalized at upload)
+            clauses.append({"extracted_skills_list": {"$in": required_skills_lower}})
+        query: Dict[str, Any] = clauses[0] if len(clauses) == 1 else {"$and": clauses}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Candidate search query: {query}")
+
+        # --- 2. Fetch Ranked Candidates (scored, sorted and limited by MongoDB) ---
+        # $match always leads so the planner can use indexes
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": query},
+            *self._candidate_top_k_stages(required_skills_lower, use_text_score, limit),
+        ]
         try:
-            # Fetch slightly more to allow for reranking after score calculation
-            # Apply projection if defined
-            find_query = self.user_collection.find(
-                query, projection=projection if projection else None
-            )
-            cursor = find_query.sort(sort_criteria).limit(limit * 3)
-            candidates_to_rank = await cursor.to_list(length=None)
-            logger.debug(
-                f"Found {len(candidates_to_rank)} candidates matching query for ranking."
-            )
+            # The pipeline yields at most `limit` docs: one batch returns them all (no getMore round trips),
+            # and a top-K this small never needs to spill the sort to disk
+            cursor = await self.user_collection.aggregate(pipeline, batchSize=limit, allowDiskUse=False)
+            candidates_to_rank = await cursor.to_list(length=limit)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Found {len(candidates_to_rank)} ranked candidates matching query.")
         except Exception as e:
             logger.error(
                 f"Database query failed during candidate search: {e}", exc_info=True
             )
-            # Check for specific PyMongo OperationFailure due to missing text index
-            if isinstance(e, Exception) and "text index required" in str(e).lower(): # Check type more broadly
-                logger.warning(
-                    "Text search failed due to missing 'resume_text' index. Returning empty results for keyword search part."
-                )
-                # If it's a text index issue, we might want to return empty or proceed without text score
-                # For now, let's return empty if a keyword was provided, as text search is key.
-                if keyword: # Only return empty if keyword search was the primary goal
-                    return []
-                # If no keyword, but other filters, the error might be different or we might proceed.
-                # This specific handling is for when $text fails.
-            
-            # Fallback for other DB errors
             raise HTTPException(
                 status_code=500, detail="Database error during candidate search."
             )
@@ -202,60 +284,36 @@ class SearchService:
         if not candidates_to_rank:
             return []
 
-        # --- 3. Rank Candidates ---
-        ranked_list = []
-        for cand_doc in candidates_to_rank:
-            extracted_data = self._get_stored_analysis_data(
-                cand_doc
-            )  # Use internal helper
-            mongo_score = cand_doc.get(
-                "mongo_score", 0.0
-            )  # Get projected score if keyword search used
-
-            # Calculate the final combined score
-            final_score = self._calculate_ranking_score(  # Use internal helper
-                cand_doc,
-                extracted_data,
-                search_skills=required_skills,
-                mongo_text_score=mongo_score,
-            )
-
-            try:
-                # Populate response model using app.schemas.search.RankedCandidate
-                # This schema expects 'relevance_score' and 'match_details'
-                # It inherits fields from CandidateProfileOut.
-                
-                # Data for CandidateProfileOut part (most fields are in cand_doc)
-                # Ensure all fields required by CandidateProfileOut are correctly mapped
-                candidate_profile_data = {
-                    **cand_doc, 
-                    "id": str(cand_doc["_id"]),
-                    "extracted_skills_list": extracted_data.get("extracted_skills", []),
-                    "estimated_yoe": extracted_data.get("estimated_experience_years"),
-                }
+        # --- 3. Build Response Models ---
+        # The pipeline's $project already shapes each document for the schema, but username/email/etc. are
+        # stored data (legacy or hand-edited docs may not conform), so validate and drop bad entries.
+        # Order and size are final: the pipeline's $sort/$limit already produced the top-K
+        return _validate_ranked(_RANKED_CANDIDATES_ADAPTER, candidates_to_rank, "candidate")
 
-                # Data for RankedCandidate specific fields
-                ranked_candidate_specific_data = {
-                    "relevance_score": final_score,
-                    "match_details": { # Example match_details
-                        "mongo_text_score": mongo_score,
-                        "calculated_score_components": "details_can_be_added_here"
-                    }
-                }
-                
-                final_candidate_data = {**candidate_profile_data, **ranked_candidate_specific_data}
-                
-                ranked_entry = RankedCandidate.model_validate(final_candidate_data)
-                ranked_list.append(ranked_entry)
-            except Exception as e:
-                logger.error(
-                    f"Pydantic validation failed for candidate {cand_doc.get('_id')}: {e}",
-                    exc_info=True,
-                )
-
-        # --- 4. Sort by final calculated score and Limit ---
-        ranked_list.sort(key=lambda x: x.relevance_score if x.relevance_score is not None else 0, reverse=True)
-        return ranked_list[:limit]
+    def _build_ranked_hrs(self, hr_list_docs: List[Dict[str, Any]]) -> List[RankedHR]:
+        """ Shapes HR documents (projected with _HR_PROJ/_HR_TEXT_PROJ) into RankedHR models, keeping their order. """
+        entries = []
+        for hr_doc in hr_list_docs:
+            # Single pass: each stored field is read once straight into the RankedHR shape
+            text_score = round(hr_doc.get("mongo_score", 0.0), 4)  # Text score if this was a keyword search
+            entries.append({
+                "id": str(hr_doc["_id"]),
+                "username": hr_doc.get("username"),
+                "email": hr_doc.get("email"),
+                "role": hr_doc.get("role"), # Should be "hr"
+                "created_at": hr_doc.get("created_at"),
+                "resume_path": hr_doc.get("resume_path"),
+                # HrProfileOut specific fields
+                "hr_status": hr_doc.get("hr_status"),
+                "years_of_experience": hr_doc.get("years_of_experience"),
+                "company": hr_doc.get("company"),
+                "admin_manager_id": hr_doc.get("admin_manager_id"),
+                # RankedHR specific fields: text score is the only ranking signal for HRs
+                "relevance_score": text_score,
+                "match_details": {"text_search_score": text_score},
+            })
+        # Cursor order (textScore, or updated_at without a keyword) is already the response order
+        return _validate_ranked(_RANKED_HRS_ADAPTER, entries, "HR profile")
 
     async def search_hr_profiles(
         self,
@@ -269,44 +327,40 @@ class SearchService:
             f"Searching HR profiles. Status: {status_filter}, Keyword: {keyword}, YoE Min: {yoe_min}"
         )
 
-        # --- 1. Build Query ---
-        query: Dict[str, Any] = {"role": "hr"}
-        if status_filter:
-            query["hr_status"] = status_filter
+        keyword_clause = self._keyword_clause(keyword) if keyword else None
+        if keyword and keyword_clause is None:
+            logger.warning("Keyword HR search requested but the keyword can't be searched. Returning no results.")
+            return []
 
+        # --- 1. Build Query ---
+        clauses: List[Dict[str, Any]] = [{"role": "hr", "hr_status": status_filter} if status_filter else {"role": "hr"}]
         # Filter by HR's specific YoE field
         if yoe_min is not None:
-            query["years_of_experience"] = {"$gte": yoe_min}
+            clauses.append({"years_of_experience": {"$gte": yoe_min}})
 
-        # Keyword search on HR resume (Requires text index)
-        projection = None
+        # Keyword search on HR resume (Requires text or phrase index); only $text provides a score to sort by
+        projection: Dict[str, Any] = self._HR_PROJ
         sort_criteria: List[Tuple[str, Any]] = [("updated_at", -1)]
-        if keyword:
-            query["resume_text"] = {"$ne": None}  # Only search HRs with resumes
-            query["$text"] = {"$search": keyword}
-            projection = {"mongo_score": {"$meta": "textScore"}}
-            sort_criteria = [("mongo_score", {"$meta": "textScore"})]
-            logger.debug("Added $text search to HR query")
+        if keyword_clause:
+            clauses.append(keyword_clause)
+            if "$text" in keyword_clause:
+                projection = self._HR_TEXT_PROJ
+                sort_criteria = [("mongo_score", {"$meta": "textScore"})]
+        query: Dict[str, Any] = clauses[0] if len(clauses) == 1 else {"$and": clauses}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"HR search query: {query}")
 
         # --- 2. Fetch HRs ---
         try:
-            find_query = self.user_collection.find(
-                query, projection=projection if projection else None
-            )
+            find_query = self.user_collection.find(query, projection=projection)
             cursor = find_query.sort(sort_criteria).limit(
                 limit
-            )  # Limit directly as ranking is simple
-            hr_list_docs = await cursor.to_list(length=None)
-            logger.debug(f"Found {len(hr_list_docs)} HRs matching query.")
+            ).batch_size(limit)  # Limit directly as ranking is simple; whole result in the first batch
+            hr_list_docs = await cursor.to_list(length=limit)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Found {len(hr_list_docs)} HRs matching query.")
         except Exception as e:
             logger.error(f"Database query failed during HR search: {e}", exc_info=True)
-            if isinstance(e, Exception) and "text index required" in str(e).lower():
-                logger.warning(
-                    "Text search failed for HR profiles due to missing 'resume_text' index. Returning empty results for keyword search part."
-                )
-                if keyword: # Only return empty if keyword search was the primary goal
-                    return []
-            
             raise HTTPException(
                 status_code=500, detail="Database error during HR search."
             )
@@ -315,79 +369,14 @@ class SearchService:
             return []
 
         # --- 3. Format Results (Using text score as primary score for now) ---
-        results = []
-        for hr_doc in hr_list_docs:
-            try:
-                extracted_data = self._get_stored_analysis_data(hr_doc)
-                mongo_score = hr_doc.get(
-                    "mongo_score", 0.0
-                )  # Get text score if available
-
-                # Populate response model using app.schemas.search.RankedHR
-                # This schema expects 'relevance_score' and 'match_details'
-                # It inherits fields from HrProfileOut.
-                
-                # Data for HrProfileOut part
-                hr_profile_data = {**hr_doc, "id": str(hr_doc["_id"])}
-                
-                # Data for RankedHR specific fields
-                # For now, using mongo_score as relevance_score, no complex match_details
-                ranked_hr_specific_data = {
-                    "relevance_score": round(mongo_score, 4),
-                    "match_details": {"text_search_score": round(mongo_score, 4)} # Example detail
-                }
-                
-                # Combine data for RankedHR validation
-                # Ensure all fields from HrProfileOut are present in hr_profile_data
-                # or handled by Pydantic's validation (e.g. default values)
-                final_hr_data = {**hr_profile_data, **ranked_hr_specific_data}
-
-                # Ensure all fields required by HrProfileOut are correctly mapped from hr_doc
-                # Example: HrProfileOut expects 'years_of_experience', ensure hr_doc has it or it's optional
-                # The HrProfileOut schema has 'years_of_experience: Optional[int] = Field(None, ge=0)'
-                # It also has 'extracted_skills_list' (from UserOut via HrProfileOut)
-                # and 'resume_path' (from UserOut)
-                # The internal RankedHR had 'extracted_skills' aliased to 'extracted_skills_list'
-                # Let's ensure this alignment for the external schema.
-                # HrProfileOut inherits 'resume_path' from UserOut.
-                # It also has 'company: Optional[str] = None'.
-                # The User model should have these fields for HR users.
-
-                # Map fields from hr_doc to what RankedHR (from app.schemas.search) expects
-                # This includes fields from HrProfileOut (which comes from UserOut)
-                mapped_data = {
-                    "id": str(hr_doc["_id"]),
-                    "username": hr_doc.get("username"),
-                    "email": hr_doc.get("email"),
-                    "role": hr_doc.get("role"), # Should be "hr"
-                    "created_at": hr_doc.get("created_at"),
-                    "resume_path": hr_doc.get("resume_path"),
-                    # HrProfileOut specific fields
-                    "hr_status": hr_doc.get("hr_status"), # Added hr_status
-                    "years_of_experience": hr_doc.get("years_of_experience"),
-                    "company": hr_doc.get("company"),
-                    "admin_manager_id": hr_doc.get("admin_manager_id"), # Added admin_manager_id
-                    # UserOut fields (already covered by HrProfileOut inheritance)
-                    # CandidateProfileOut specific fields are not relevant here
-                    # RankedHR specific fields
-                    "relevance_score": round(mongo_score, 4),
-                    "match_details": {"text_search_score": round(mongo_score, 4)}, # Example
-                    # Ensure extracted_skills_list is populated if present in HrProfileOut
-                    "extracted_skills_list": extracted_data.get("extracted_skills", [])
-                }
-                # Filter out None values if Pydantic models don't handle them as default
-                # mapped_data = {k: v for k, v in mapped_data.items() if v is not None}
-
+        return self._build_ranked_hrs(hr_list_docs)
 
-                ranked_entry = RankedHR.model_validate(mapped_data)
-                results.append(ranked_entry)
-            except Exception as e:
-                logger.error(
-                    f"Pydantic validation failed for HR profile {hr_doc.get('_id')}: {e}",
-                    exc_info=True,
-                )
 
-        # Re-sort by relevance_score
-        results.sort(key=lambda x: x.relevance_score if x.relevance_score is not None else 0, reverse=True)
-
-        return results
+@lru_cache(maxsize=1)
+def get_search_service() -> SearchService:
+    """
+    FastAPI dependency returning the process-wide SearchService, built on first use (after startup
+    has connected MongoDB) so the collection handle and projections are reused across requests.
+    Cleared on shutdown, since the handle belongs to the closed client.
+    """
+    return SearchService()
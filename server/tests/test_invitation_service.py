@@ -0,0 +1,175 @@
+# LLM_interviewer/server/tests/test_invitation_service.py
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.models.user import User
+from app.services import invitation_service as invitation_module
+from app.services.invitation_service import InvitationError, InvitationService
+
+
+class _AsyncCursor:
+    """ Minimal stand-in for an async find() cursor: sort() is chainable and iteration yields the given docs. """
+
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._docs)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._docs:
+            yield doc
+
+
+@pytest.fixture
+def collections():
+    users, requests = MagicMock(), MagicMock()
+    for collection in (users, requests):
+        collection.find_one = AsyncMock(return_value=None)
+        collection.insert_one = AsyncMock(return_value=SimpleNamespace(acknowledged=True))
+        collection.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=1, modified_count=1))
+        collection.delete_one = AsyncMock()
+        collection.find_one_and_update = AsyncMock(return_value=None)
+    return SimpleNamespace(users=users, requests=requests)
+
+
+@pytest.fixture
+def service(collections):
+    db = {
+        settings.MONGODB_COLLECTION_USERS: collections.users,
+        settings.MONGODB_COLLECTION_HR_MAPPING_REQUESTS: collections.requests,
+    }
+    return InvitationService(db=db)
+
+
+def _user(role, **fields):
+    return User(_id=ObjectId(), username=f"{role}user", email=f"{role}@example.com", hashed_password="x", role=role, **fields)
+
+
+@pytest.mark.asyncio
+async def test_create_application_duplicate_pending_is_a_conflict(service, collections):
+    hr_user = _user("hr", hr_status="profile_complete")
+    collections.users.find_one.return_value = {"_id": ObjectId()} # Target admin exists
+    collections.requests.insert_one.side_effect = DuplicateKeyError("E11000 one_pending_per_hr")
+
+    with pytest.raises(InvitationError, match="already has a pending"):
+        await service.create_hr_application(hr_user, ObjectId())
+
+    # The concurrent status update went through, so it is rolled back
+    rollback_filter, rollback_update = collections.users.update_one.await_args_list[-1].args
+    assert rollback_filter == {"_id": hr_user.id, "hr_status": "application_pending"}
+    assert rollback_update["$set"]["hr_status"] == "profile_complete"
+
+
+@pytest.mark.asyncio
+async def test_create_admin_request_duplicate_pending_is_a_conflict(service, collections):
+    collections.users.find_one.return_value = {"_id": ObjectId(), "hr_status": "profile_complete"}
+    collections.requests.insert_one.side_effect = DuplicateKeyError("E11000 one_pending_per_hr")
+
+    with pytest.raises(InvitationError, match="already has a pending"):
+        await service.create_admin_request(_user("admin"), ObjectId())
+    collections.users.update_one.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_application_failed_update_rolls_back_insert(service, collections):
+    hr_user = _user("hr", hr_status="profile_complete")
+    collections.users.find_one.side_effect = [
+        {"_id": ObjectId()}, # Target admin exists
+        {"hr_status": "profile_complete"}, # Re-read after the failed update
+    ]
+    collections.users.update_one.return_value = SimpleNamespace(matched_count=0, modified_count=0)
+
+    with pytest.raises(InvitationError, match="Failed to update HR user status"):
+        await service.create_hr_application(hr_user, ObjectId())
+
+    inserted_doc = collections.requests.insert_one.await_args.args[0]
+    collections.requests.delete_one.assert_awaited_once_with({"_id": inserted_doc["_id"]})
+
+
+@pytest.mark.asyncio
+async def test_create_admin_request_failed_update_rolls_back_insert(service, collections):
+    target_hr_id = ObjectId()
+    collections.users.find_one.side_effect = [
+        {"_id": target_hr_id, "hr_status": "profile_complete"},
+        {"_id": target_hr_id, "hr_status": "mapped"}, # Status changed concurrently
+    ]
+    inserted_id = ObjectId()
+    collections.requests.insert_one.return_value = SimpleNamespace(acknowledged=True, inserted_id=inserted_id)
+    collections.users.update_one.return_value = SimpleNamespace(matched_count=0, modified_count=0)
+
+    with pytest.raises(InvitationError, match="Actual: mapped"):
+        await service.create_admin_request(_user("admin"), target_hr_id)
+    collections.requests.delete_one.assert_awaited_once_with({"_id": inserted_id})
+
+
+@pytest.mark.asyncio
+async def test_reject_resets_hr_status_with_one_conditional_update(service, collections, monkeypatch):
+    monkeypatch.setattr(invitation_module.mongodb, "pending_rows_without_hr_ref", False)
+    hr_user = _user("hr", hr_status="admin_request_pending")
+    request_id = ObjectId()
+    collections.requests.find_one.return_value = {
+        "_id": request_id, "request_type": "request", "status": "pending",
+        "requester_id": ObjectId(), "requester_role": "admin", "target_id": hr_user.id, "target_role": "hr",
+    }
+    collections.users.find_one_and_update.return_value = {"hr_status": "admin_request_pending"}
+
+    assert await service.reject_request_or_application(request_id, hr_user) is True
+    reset_filter = collections.users.find_one_and_update.await_args.args[0]
+    assert reset_filter == {"_id": hr_user.id, "hr_status": {"$in": ["application_pending", "admin_request_pending"]}}
+    collections.requests.find_one.assert_awaited_once() # No _has_other_pending lookup
+
+
+@pytest.mark.asyncio
+async def test_accept_runs_pending_cleanup_in_background(service, collections):
+    admin_user = _user("admin")
+    hr_id, request_id = ObjectId(), ObjectId()
+    collections.requests.find_one.return_value = {
+        "_id": request_id, "request_type": "application", "status": "pending",
+        "requester_id": hr_id, "requester_role": "hr", "target_id": admin_user.id, "target_role": "admin",
+    }
+    collections.users.find_one.return_value = {"_id": hr_id, "hr_status": "application_pending"}
+    collections.requests.bulk_write = AsyncMock(return_value=SimpleNamespace(modified_count=0))
+
+    assert await service.accept_request_or_application(request_id, admin_user) is True
+    await invitation_module.drain_pending_cleanups()
+
+    cleanup_ops = collections.requests.bulk_write.await_args.args[0]
+    assert len(cleanup_ops) == 2 # Cancel other applications, reject other requests
+    assert not invitation_module._pending_cleanup_tasks
+
+
+@pytest.mark.asyncio
+async def test_pending_applications_missing_requester_has_no_requester_info(service, collections, monkeypatch):
+    monkeypatch.setattr(invitation_module, "_REQUESTER_LOOKUP_BATCH_SIZE", 2)
+    admin_id, known_hr_id, missing_hr_id = ObjectId(), ObjectId(), ObjectId()
+    pending = [
+        {"_id": ObjectId(), "request_type": "application", "status": "pending", "requester_id": requester_id, "target_id": admin_id}
+        for requester_id in (known_hr_id, missing_hr_id, known_hr_id)
+    ]
+    collections.requests.find = MagicMock(return_value=_AsyncCursor(pending))
+    collections.users.find = MagicMock(return_value=_AsyncCursor([{"_id": known_hr_id, "username": "hruser"}]))
+
+    items = [item async for item in service.get_pending_applications_for_admin(str(admin_id))]
+
+    assert [item["_id"] for item in items] == [doc["_id"] for doc in pending]
+    assert items[0]["requester_info"]["id"] == known_hr_id
+    assert items[0]["requester_info"]["username"] == "hruser"
+    assert items[1]["requester_info"] is None
+    assert items[2]["requester_info"]["id"] == known_hr_id
+    # One batched $in lookup per chunk of _REQUESTER_LOOKUP_BATCH_SIZE rows
+    assert collections.users.find.call_count == 2
+    first_lookup_ids = collections.users.find.call_args_list[0].args[0]["_id"]["$in"]
+    assert set(first_lookup_ids) == {known_hr_id, missing_hr_id}
@@ -0,0 +1,103 @@
+# LLM_interviewer/server/tests/test_resume_analyzer.py
+
+import pytest
+
+from app.services import resume_analyzer_service as analyzer_module
+from app.services.resume_analyzer_service import ResumeAnalyzerService
+
+# Covers overlapping skills, punctuation inside skills and trailing sentence punctuation
+BACKEND_SAMPLE = (
+    "Built React.js and react-native apps; 5 years of C++, C# and Python's asyncio. "
+    "Ran PL/SQL on SQL Server, CI/CD via GitHub Actions (Docker, Kubernetes). "
+    "Migrated ASP.NET apps to .NET Core. Skilled in problem-solving, node.js."
+)
+BACKEND_SAMPLE_SKILLS = {
+    "react.js", "react", "c++", "c#", "python", "pl/sql", "sql", "sql server", "ci/cd", "github actions",
+    "docker", "kubernetes", "asp.net", ".net core", "problem-solving", "node.js",
+}
+
+
+@pytest.fixture
+def analyzer():
+    return ResumeAnalyzerService()
+
+
+def test_token_scan_fallback_matches_sample(analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer_module, "SKILL_AUTOMATON", None)
+    assert analyzer._match_skill_keywords(BACKEND_SAMPLE) == BACKEND_SAMPLE_SKILLS
+
+
+def test_automaton_fallback_matches_sample(analyzer, monkeypatch):
+    pytest.importorskip("ahocorasick")
+    monkeypatch.setattr(analyzer_module, "SKILL_AUTOMATON", analyzer_module._build_skill_automaton())
+    assert analyzer._match_skill_keywords(BACKEND_SAMPLE) == BACKEND_SAMPLE_SKILLS
+
+
+@pytest.mark.parametrize("use_spacy", [False, True])
+def test_extract_skills_same_on_both_backends(analyzer, monkeypatch, use_spacy):
+    if use_spacy and analyzer.nlp is None:
+        pytest.skip("No spaCy model installed")
+    if not use_spacy:
+        monkeypatch.setattr(analyzer, "nlp", None)
+    monkeypatch.setattr(analyzer_module.settings, "RESUME_FORCE_NER", False)
+    monkeypatch.setattr(analyzer_module.settings, "RESUME_SKILL_FAST_PATH_THRESHOLD", 0) # Keywords only
+    text = BACKEND_SAMPLE + " Deployed on AWS (EC2,S3)."
+    assert analyzer._extract_skills_sync(text) == sorted(BACKEND_SAMPLE_SKILLS | {"aws", "ec2", "s3"})
+
+
+@pytest.mark.parametrize("use_automaton", [False, True])
+def test_fallbacks_reject_skills_inside_longer_tokens(analyzer, monkeypatch, use_automaton):
+    if use_automaton:
+        pytest.importorskip("ahocorasick")
+        monkeypatch.setattr(analyzer_module, "SKILL_AUTOMATON", analyzer_module._build_skill_automaton())
+    else:
+        monkeypatch.setattr(analyzer_module, "SKILL_AUTOMATON", None)
+    text = "Reactive, pythonic javascript3 and python3. Shipped TypeScript."
+    assert analyzer._match_skill_keywords(text) == {"typescript"}
+
+
+def test_normalize_skills_strips_lowercases_dedupes_and_sorts():
+    assert analyzer_module.normalize_skills([" Python", "python ", "FastAPI", "", "   ", "C++"]) == ["c++", "fastapi", "python"]
+
+
+def test_month_lut_covers_every_casing():
+    assert len(analyzer_module.MONTH_LUT) == 12 * 2 ** 3
+    assert analyzer_module.MONTH_LUT["Jan"] == 0
+    assert analyzer_module.MONTH_LUT["sEp"] == 8
+    assert analyzer_module.MONTH_LUT["DEC"] == 11
+
+
+@pytest.mark.parametrize(
+    "month_name, month_num, year, expected",
+    [
+        (None, None, "2020", 2020 * 12),
+        ("Mar", None, "2021", 2021 * 12 + 2),
+        ("OCT", None, "2019", 2019 * 12 + 9),
+        (None, "07", "2021", 2021 * 12 + 6),
+        (None, "13", "2021", 2021 * 12),  # Out-of-range month falls back to January
+        (None, None, None, None),
+    ],
+)
+def test_parse_date_returns_month_index(analyzer, month_name, month_num, year, expected):
+    assert analyzer._parse_date(month_name, month_num, year) == expected
+
+
+def test_explicit_yoe_mention_is_returned_as_float(analyzer):
+    estimated_yoe = analyzer._extract_experience_years_sync("Backend engineer with 5+ years of Python.")
+    assert estimated_yoe == 5.0
+    assert isinstance(estimated_yoe, float)
+
+
+
+@pytest.mark.parametrize(
+    "intervals, expected",
+    [
+        ([(0, 11)], 12),
+        ([(0, 11), (6, 17)], 18),  # Overlap counted once
+        ([(12, 23), (0, 11)], 24),  # Unsorted, adjacent
+        ([(0, 5), (12, 17)], 12),  # Gap not counted
+        ([(0, 23), (3, 5)], 24),  # Contained interval
+    ],
+)
+def test_merged_month_span(intervals, expected):
+    assert analyzer_module._merged_month_span(list(intervals)) == expected
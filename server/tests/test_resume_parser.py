@@ -0,0 +1,46 @@
+# LLM_interviewer/server/tests/test_resume_parser.py
+
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from app.services.resume_parser import ResumeParserError, _parse_docx_sync
+
+DOCX_PATH = Path("resume.docx")
+
+
+def _docx_bytes(body_xml: str) -> bytes:
+    document_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body_xml}</w:body></w:document>"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as docx_zip:
+        docx_zip.writestr("word/document.xml", document_xml)
+    return buffer.getvalue()
+
+
+def test_parse_docx_extracts_paragraphs_tabs_and_breaks():
+    doc_bytes = _docx_bytes(
+        "<w:p><w:r><w:t>Jane Doe</w:t></w:r></w:p>"
+        "<w:p><w:r><w:t>Python</w:t><w:tab/><w:t>Fast</w:t></w:r><w:r><w:t>API</w:t></w:r></w:p>"
+        "<w:p></w:p>"  # Empty paragraphs are skipped
+        "<w:p><w:r><w:t>Line one</w:t><w:br/><w:t>Line two</w:t></w:r></w:p>"
+    )
+    assert _parse_docx_sync(doc_bytes, DOCX_PATH) == "Jane Doe\nPython\tFastAPI\nLine one\nLine two"
+
+
+def test_parse_docx_rejects_non_zip_bytes():
+    with pytest.raises(ResumeParserError):
+        _parse_docx_sync(b"not a docx", DOCX_PATH)
+
+
+def test_parse_docx_rejects_zip_without_document_xml():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as docx_zip:
+        docx_zip.writestr("word/styles.xml", "<styles/>")
+    with pytest.raises(ResumeParserError):
+        _parse_docx_sync(buffer.getvalue(), DOCX_PATH)
@@ -0,0 +1,157 @@
+# LLM_interviewer/server/tests/test_search_service.py
+
+import logging
+import math
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.schemas.search import RankedCandidate
+from app.services.search_service import (
+    _RANKED_CANDIDATES_ADAPTER,
+    SearchService,
+    _validate_ranked,
+    extract_resume_phrases,
+    keyword_to_phrase,
+)
+
+
+def test_extract_resume_phrases_orders_shorter_phrases_first(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_PHRASE_MAX_WORDS", 3)
+    monkeypatch.setattr(settings, "SEARCH_PHRASE_MAX_PHRASES", 2000)
+    assert extract_resume_phrases("Senior Python developer with the FastAPI stack") == [
+        "senior python", "python developer", "developer fastapi", "fastapi stack",
+        "senior python developer", "python developer fastapi", "developer fastapi stack",
+    ]
+
+
+def test_extract_resume_phrases_dedupes_and_skips_single_words(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_PHRASE_MAX_WORDS", 6)
+    monkeypatch.setattr(settings, "SEARCH_PHRASE_MAX_PHRASES", 2000)
+    assert extract_resume_phrases("C++ and C++, C++") == ["c++ c++", "c++ c++ c++"]
+    assert extract_resume_phrases("Python") == []
+
+
+def test_extract_resume_phrases_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_PHRASE_MAX_WORDS", 6)
+    monkeypatch.setattr(settings, "SEARCH_PHRASE_MAX_PHRASES", 2)
+    assert extract_resume_phrases("Senior Python developer with the FastAPI stack") == ["senior python", "python developer"]
+
+
+@pytest.mark.parametrize(
+    "keyword, expected",
+    [
+        ("Machine Learning", "machine learning"),
+        ("C++ and Go", "c++ go"),
+        ("python", None),
+        ("the python", None),  # One word once stop words are removed
+        ("one two three four five six seven", None),
+    ],
+)
+def test_keyword_to_phrase(monkeypatch, keyword, expected):
+    monkeypatch.setattr(settings, "SEARCH_PHRASE_MAX_WORDS", 6)
+    assert keyword_to_phrase(keyword) == expected
+
+
+def _candidate_entry(username, role="candidate"):
+    return {"id": str(ObjectId()), "username": username, "email": f"{username}@example.com", "role": role}
+
+
+def test_validate_ranked_keeps_valid_entries():
+    entries = [_candidate_entry("alice"), _candidate_entry("bob")]
+    ranked = _validate_ranked(_RANKED_CANDIDATES_ADAPTER, entries, "candidate")
+    assert [candidate.username for candidate in ranked] == ["alice", "bob"]
+    assert all(isinstance(candidate, RankedCandidate) for candidate in ranked)
+
+
+def test_validate_ranked_drops_invalid_entries(caplog):
+    entries = [_candidate_entry("alice"), _candidate_entry("mallory", role="superuser"), _candidate_entry("bob")]
+    with caplog.at_level(logging.WARNING, logger="app.services.search_service"):
+        ranked = _validate_ranked(_RANKED_CANDIDATES_ADAPTER, entries, "candidate")
+    assert [candidate.username for candidate in ranked] == ["alice", "bob"]
+    assert entries[1]["id"] in caplog.text
+
+
+# --- Server-side ranking vs. the former Python scorer ---
+# The ranking stages are evaluated here with a tiny interpreter for the operators they use, so the
+# aggregation expressions can be checked against the scorer they replaced without a MongoDB server.
+
+def _eval_expr(expr, doc):
+    if isinstance(expr, str) and expr.startswith("$"):
+        return doc.get(expr[1:])
+    if isinstance(expr, list):
+        return [_eval_expr(item, doc) for item in expr]
+    if not (isinstance(expr, dict) and len(expr) == 1 and next(iter(expr)).startswith("$")):
+        return expr
+    op, arg = next(iter(expr.items()))
+    if op == "$meta":
+        return doc["_text_score"]
+    if op == "$ifNull":
+        value = _eval_expr(arg[0], doc)
+        return value if value is not None else _eval_expr(arg[1], doc)
+    if op == "$cond":
+        return _eval_expr(arg[1] if _eval_expr(arg[0], doc) else arg[2], doc)
+    args = _eval_expr(arg, doc)
+    return {
+        "$size": lambda: len(args),
+        "$setIntersection": lambda: list(set(args[0]) & set(args[1])),
+        "$setUnion": lambda: list(set(args[0]) | set(args[1])),
+        "$gt": lambda: args[0] > args[1],
+        "$divide": lambda: args[0] / args[1],
+        "$max": lambda: max(args),
+        "$multiply": lambda: math.prod(args),
+        "$add": lambda: sum(args),
+        "$round": lambda: round(args[0], args[1]),
+    }[op]()
+
+
+def _run_add_fields(stages, doc):
+    for stage in stages:
+        (op, fields), = stage.items()
+        assert op == "$addFields"
+        doc = {**doc, **{name: _eval_expr(expr, doc) for name, expr in fields.items()}}
+    return doc
+
+
+def _former_python_score(doc, search_skills, mongo_text_score):
+    """ The scorer the aggregation replaced: Jaccard tech match x max(1, YoE), blended with the text score. """
+    candidate_skills = doc.get("extracted_skills_list", [])
+    yoe = doc.get("estimated_yoe", 0.0) or 0.0
+    tech_match_score = 1.0
+    if search_skills:
+        if not candidate_skills:
+            tech_match_score = 0.0
+        else:
+            set_candidate, set_required = set(candidate_skills), set(search_skills)
+            tech_match_score = len(set_candidate & set_required) / len(set_candidate | set_required)
+    return round((0.70 * tech_match_score * max(1.0, yoe)) + (0.30 * mongo_text_score), 4)
+
+
+RANKING_FIXTURES = [
+    {"username": "alice", "extracted_skills_list": ["python", "fastapi"], "estimated_yoe": 5.0, "_text_score": 1.2},
+    {"username": "bob", "extracted_skills_list": ["python", "docker", "fastapi", "kubernetes"], "estimated_yoe": 2.0, "_text_score": 0.5},
+    {"username": "carol", "extracted_skills_list": None, "_text_score": 2.0},  # Legacy doc: no skills, no YoE
+    {"username": "dave", "extracted_skills_list": ["java"], "estimated_yoe": 0.5, "_text_score": 0.1},
+    {"username": "erin", "extracted_skills_list": ["docker"], "estimated_yoe": 10.0, "_text_score": 0.0},
+    {"username": "frank", "extracted_skills_list": [], "estimated_yoe": 3.5, "_text_score": 0.9},
+]
+
+
+@pytest.mark.parametrize("required_skills", [["python", "fastapi", "docker"], ["java"], None])
+@pytest.mark.parametrize("use_text_score", [True, False])
+def test_ranking_stages_match_former_python_scorer(required_skills, use_text_score):
+    service = SearchService(db={settings.MONGODB_COLLECTION_USERS: MagicMock()})
+    stages = service._build_candidate_ranking_stages(required_skills, use_text_score)
+
+    scored = [_run_add_fields(stages, doc) for doc in RANKING_FIXTURES]
+    expected = {
+        doc["username"]: _former_python_score(doc, required_skills, doc["_text_score"] if use_text_score else 0.0)
+        for doc in RANKING_FIXTURES
+    }
+
+    scores = {doc["username"]: doc["relevance_score"] for doc in scored}
+    assert scores == pytest.approx(expected)
+    # Same order, ties kept in fixture order as the former stable list.sort did
+    assert sorted(scores, key=scores.get, reverse=True) == sorted(expected, key=expected.get, reverse=True)